@@ -0,0 +1,469 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import argparse
+import atexit
+import gc
+import hashlib
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from solution import roads_and_libraries
+from sparse_solution import roads_and_libraries_sparse
+from external_solution import roads_and_libraries_external
+from renumbering import ORDERS, build_csr, bfs_order, compute_renumbering, mean_edge_gap
+from solver import Solver
+from components import CityGraph
+from estimator import estimate_cost
+
+Case = Tuple[int, int, int, List[List[int]]]
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_history.sqlite")
+
+# Relative slowdown below which a change is never reported, whatever the noise
+MIN_RELATIVE_CHANGE = 0.10
+# How many robust standard deviations a change must exceed to be reported
+NOISE_FACTOR = 3.0
+# Recorded runs needed before a change is judged at all
+MIN_BASELINE_RUNS = 3
+# Share of (new, recorded) sample pairs the new run must lose, or win, for a verdict
+MIN_DOMINANCE = 0.9
+
+def random_family(size: int, rng: random.Random) -> List[List[int]]:
+    """About two roads per city between random pairs."""
+    return [[rng.randint(1, size), rng.randint(1, size)] for _ in range(2 * size)]
+
+def path_family(size: int, rng: random.Random) -> List[List[int]]:
+    """One long chain of cities in shuffled order, the deepest possible traversal."""
+    cities = list(range(1, size + 1))
+    rng.shuffle(cities)
+    return [[u, v] for u, v in zip(cities, cities[1:])]
+
+def star_family(size: int, rng: random.Random) -> List[List[int]]:
+    """Every city connected to a single hub."""
+    hub = rng.randint(1, size)
+    return [[hub, city] for city in range(1, size + 1) if city != hub]
+
+def forest_family(size: int, rng: random.Random) -> List[List[int]]:
+    """Many small components of up to eight cities each."""
+    edges = []
+    for start in range(1, size + 1, 8):
+        members = list(range(start, min(start + 8, size + 1)))
+        for i in range(1, len(members)):
+            edges.append([members[rng.randrange(i)], members[i]])
+    return edges
+
+def grid_family(size: int, rng: random.Random) -> List[List[int]]:
+    """A road-like square grid whose city IDs are shuffled, as in real feeds."""
+    side = max(1, int(size ** 0.5))
+    ids = list(range(1, size + 1))
+    rng.shuffle(ids)
+    edges = []
+    for row in range(side):
+        for column in range(side):
+            city = row * side + column
+            if column + 1 < side:
+                edges.append([ids[city], ids[city + 1]])
+            if row + 1 < side:
+                edges.append([ids[city], ids[city + side]])
+    return edges
+
+FAMILIES: Dict[str, Callable[[int, random.Random], List[List[int]]]] = {
+    "random": random_family,
+    "path": path_family,
+    "star": star_family,
+    "forest": forest_family,
+    "grid": grid_family,
+}
+
+def generate_case(family: str, size: int, seed: int = 42) -> Case:
+    rng = random.Random(seed)
+    return size, 5, 2, FAMILIES[family](size, rng)
+
+def bfs_engine(case: Case) -> Callable[[], int]:
+    return lambda: roads_and_libraries(*case)
+
+def sparse_engine(case: Case) -> Callable[[], int]:
+    return lambda: roads_and_libraries_sparse(*case)
+
+def external_engine(case: Case) -> Callable[[], int]:
+    n, c_lib, c_road, city_edges = case
+    # Writing the edge file is setup, not part of the measurement
+    handle, edge_path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(handle, 'w') as file:
+        file.writelines(f"{u} {v}\n" for u, v in city_edges)
+    atexit.register(os.remove, edge_path)
+    return lambda: roads_and_libraries_external(n, c_lib, c_road, edge_path, max_labels=max(2, n // 4))
+
+def solver_engine(case: Case) -> Callable[[], int]:
+    # One solver serves every call, as in a serving loop
+    solver = Solver(case[0])
+    return lambda: solver.solve(*case)
+
+# Each engine prepares a case outside of the timed region and returns the timed call
+ENGINES: Dict[str, Callable[[Case], Callable[[], int]]] = {
+    "bfs": bfs_engine,
+    "sparse": sparse_engine,
+    "external": external_engine,
+    "solver": solver_engine,
+}
+
+class Measurement(NamedTuple):
+    engine: str
+    family: str
+    size: int
+    best: float
+    median: float
+    stdev: float
+    samples: List[float]
+
+class Comparison(NamedTuple):
+    measurement: Measurement
+    baseline: Optional[float]
+    noise: Optional[float]
+    status: str
+
+# Like timeit's autorange, fast calls are looped until a sample takes this long
+MIN_SAMPLE_TIME = 0.02
+
+def measure(run: Callable[[], int], repeats: int) -> List[float]:
+    """
+    Times `run` with the garbage collector paused, like timeit. Each of the
+    `repeats` samples is the average time per call over enough calls to last
+    at least `MIN_SAMPLE_TIME`, which keeps timer resolution out of fast cases.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(loops):
+                run()
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_SAMPLE_TIME:
+                break
+            loops *= 2
+
+        samples = [elapsed / loops]
+        for _ in range(repeats - 1):
+            start = time.perf_counter()
+            for _ in range(loops):
+                run()
+            samples.append((time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+def machine_fingerprint() -> str:
+    """A short stable ID for this machine and interpreter, so timings are only compared like for like."""
+    description = "|".join([
+        platform.system(),
+        platform.machine(),
+        platform.processor(),
+        platform.python_implementation(),
+        platform.python_version(),
+        str(os.cpu_count()),
+    ])
+    return hashlib.sha256(description.encode()).hexdigest()[:12]
+
+def current_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit or "unknown"
+
+def open_history(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recorded_at REAL NOT NULL,
+            commit_hash TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            engine TEXT NOT NULL,
+            family TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            best REAL NOT NULL,
+            median REAL NOT NULL,
+            stdev REAL NOT NULL,
+            samples TEXT NOT NULL
+        )
+        """
+    )
+    return connection
+
+def record(connection: sqlite3.Connection, commit: str, fingerprint: str, measurement: Measurement) -> None:
+    connection.execute(
+        "INSERT INTO runs (recorded_at, commit_hash, fingerprint, engine, family, size, best, median, stdev, samples) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (time.time(), commit, fingerprint, measurement.engine, measurement.family, measurement.size,
+         measurement.best, measurement.median, measurement.stdev, ",".join(f"{sample:.9f}" for sample in measurement.samples))
+    )
+    connection.commit()
+
+def compare(
+    connection: sqlite3.Connection,
+    fingerprint: str,
+    measurement: Measurement,
+    window: int
+) -> Comparison:
+    """
+    Compares a measurement's samples to those of the last `window` recorded runs
+    on this machine. The baseline is the median of the runs' median times, and the
+    noise is the largest of the spread between those medians (scaled median absolute
+    deviation), the typical spread within them, and the new run's own spread. A change only counts once the new
+    median clears both `NOISE_FACTOR` times that noise and `MIN_RELATIVE_CHANGE` of
+    the baseline, and the new samples also rank almost all above (or below) the
+    recorded ones. Until `MIN_BASELINE_RUNS` runs are recorded there is no spread
+    between runs to go by, so no verdict is given.
+    """
+    rows = connection.execute(
+        "SELECT median, stdev, samples FROM runs WHERE fingerprint = ? AND engine = ? AND family = ? AND size = ? "
+        "ORDER BY id DESC LIMIT ?",
+        (fingerprint, measurement.engine, measurement.family, measurement.size, window)
+    ).fetchall()
+    if not rows:
+        return Comparison(measurement, None, None, "new")
+
+    medians = [median for median, _, _ in rows]
+    baseline = statistics.median(medians)
+    if len(rows) < MIN_BASELINE_RUNS:
+        return Comparison(measurement, baseline, None, "insufficient history")
+
+    mad = statistics.median(abs(median - baseline) for median in medians) * 1.4826
+    noise = max(mad, statistics.median(stdev for _, stdev, _ in rows), measurement.stdev)
+    threshold = max(NOISE_FACTOR * noise, MIN_RELATIVE_CHANGE * baseline)
+
+    # How often a new sample is slower than a recorded one, ties counting half
+    recorded = [float(sample) for _, _, samples in rows for sample in samples.split(",")]
+    slower = sum(
+        1.0 if sample > old else 0.5 if sample == old else 0.0
+        for sample in measurement.samples for old in recorded
+    ) / (len(measurement.samples) * len(recorded))
+
+    change = measurement.median - baseline
+    if change > threshold and slower >= MIN_DOMINANCE:
+        status = "REGRESSION"
+    elif change < -threshold and slower <= 1 - MIN_DOMINANCE:
+        status = "improvement"
+    else:
+        status = "ok"
+    return Comparison(measurement, baseline, noise, status)
+
+def print_report(comparisons: List[Comparison]) -> None:
+    header = f"{'family':<8} {'size':>9} {'engine':<10} {'baseline':>11} {'current':>11} {'change':>8}  status"
+    print(header)
+    print("-" * len(header))
+    for comparison in sorted(comparisons, key=lambda c: (c.measurement.family, c.measurement.size, c.measurement.engine)):
+        m = comparison.measurement
+        if comparison.baseline is None:
+            baseline, change = "-", "-"
+        else:
+            baseline = f"{comparison.baseline * 1000:.2f}ms"
+            change = f"{(m.median / comparison.baseline - 1) * 100:+.1f}%"
+        print(f"{m.family:<8} {m.size:>9} {m.engine:<10} {baseline:>11} {m.median * 1000:>9.2f}ms {change:>8}  {comparison.status}")
+
+    regressions = sum(c.status == "REGRESSION" for c in comparisons)
+    improvements = sum(c.status == "improvement" for c in comparisons)
+    unjudged = sum(c.status in ("new", "insufficient history") for c in comparisons)
+    summary = f"\n{regressions} regression(s), {improvements} improvement(s), {len(comparisons)} benchmark(s)"
+    if unjudged:
+        summary += f", {unjudged} without enough history to judge"
+    print(summary + ".")
+
+def run_benchmarks(
+    engines: List[str],
+    families: List[str],
+    sizes: List[int],
+    repeats: int
+) -> List[Measurement]:
+    measurements = []
+    for family in families:
+        for size in sizes:
+            case = generate_case(family, size)
+            expected = None
+            for engine in engines:
+                run = ENGINES[engine](case)
+                result = run()  # Warm-up, and a sanity check that every engine agrees
+                if expected is None:
+                    expected = result
+                elif result != expected:
+                    raise AssertionError(f"{engine} returned {result} on {family}/{size}, expected {expected}.")
+                samples = measure(run, repeats)
+                measurements.append(Measurement(
+                    engine, family, size,
+                    min(samples),
+                    statistics.median(samples),
+                    statistics.stdev(samples) if len(samples) > 1 else 0.0,
+                    samples
+                ))
+    return measurements
+
+def locality_report(size: int, repeats: int) -> None:
+    """
+    Shows how each renumbering improves locality on a shuffled grid. Pure Python
+    cannot read hardware cache counters, so locality is reported as the mean ID
+    gap across roads, next to the time of a CSR breadth-first traversal.
+    """
+    n, _, _, city_edges = generate_case("grid", size)
+    print(f"Locality on a shuffled grid of {n} cities and {len(city_edges)} roads\n")
+    header = f"{'numbering':<10} {'mean gap':>12} {'renumber':>10} {'traversal':>10} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+
+    us = [u for u, _ in city_edges]
+    vs = [v for _, v in city_edges]
+    offsets, targets = build_csr(n, us, vs)
+    original = min(measure(lambda: bfs_order(n, offsets, targets), repeats))
+    print(f"{'original':<10} {mean_edge_gap(us, vs):>12.1f} {'-':>10} {original * 1000:>8.1f}ms {1.0:>7.2f}x")
+
+    for method in ORDERS:
+        start = time.perf_counter()
+        renumbering = compute_renumbering(n, city_edges, method)
+        renumber_time = time.perf_counter() - start
+
+        new_us, new_vs = renumbering.relabel_edges(city_edges)
+        new_offsets, new_targets = build_csr(n, new_us, new_vs)
+        traversal = min(measure(lambda: bfs_order(n, new_offsets, new_targets), repeats))
+        print(f"{method:<10} {mean_edge_gap(new_us, new_vs):>12.1f} {renumber_time * 1000:>8.0f}ms "
+              f"{traversal * 1000:>8.1f}ms {original / traversal:>7.2f}x")
+
+ESTIMATE_SEED = 7
+
+def estimate_report(families: List[str], sizes: List[int], repeats: int) -> None:
+    """
+    Shows the sampled cost estimate next to the exact answer of `roads_and_libraries`.
+    The estimator reads an adjacency that is built beforehand, outside of its timing,
+    as it would be when the graph is already stored that way.
+    """
+    header = (f"{'family':<8} {'size':>8} {'exact':>10} {'time':>9} {'estimate':>12} "
+              f"{'bounds':>23} {'error':>8} {'time':>9} {'speedup':>8}")
+    print(header)
+    print("-" * len(header))
+    for family in families:
+        for size in sizes:
+            n, c_lib, c_road, city_edges = generate_case(family, size)
+            exact = roads_and_libraries(n, c_lib, c_road, city_edges)
+            exact_time = min(measure(lambda: roads_and_libraries(n, c_lib, c_road, city_edges), repeats))
+
+            # The sampling seed must differ from the generator's, or the sampled cities
+            # would replay the random stream that picked the road endpoints
+            graph = CityGraph(n, city_edges)
+            estimate = estimate_cost(graph, c_lib, c_road, seed=ESTIMATE_SEED)
+            estimate_time = min(measure(lambda: estimate_cost(graph, c_lib, c_road, seed=ESTIMATE_SEED), repeats))
+
+            bounds = f"[{estimate.lower:.0f}, {estimate.upper:.0f}]"
+            print(f"{family:<8} {size:>8} {exact:>10} {exact_time * 1000:>7.1f}ms {estimate.estimate:>12.0f} "
+                  f"{bounds:>23} {(estimate.estimate - exact) / exact:>+8.2%} {estimate_time * 1000:>7.1f}ms "
+                  f"{exact_time / estimate_time:>7.1f}x")
+
+# How long each round of the allocation report keeps solving
+SERVING_ROUND_TIME = 0.25
+
+def allocation_report(size: int, repeats: int) -> None:
+    """
+    Compares a fresh `roads_and_libraries` per call with a reused `Solver` in a
+    serving loop. Unlike `measure`, the garbage collector stays enabled, so the
+    throughput includes the collections each engine's allocations trigger.
+    """
+    n, _, _, city_edges = generate_case("random", size)
+    print(f"Serving loop on a random graph of {n} cities and {len(city_edges)} roads\n")
+    header = f"{'engine':<8} {'solves/s':>10} {'GC runs/1k solves':>18} {'peak alloc/solve':>17}"
+    print(header)
+    print("-" * len(header))
+
+    for engine in ("bfs", "solver"):
+        run = ENGINES[engine](generate_case("random", size))
+        run()  # Warm-up, which also lets the solver grow its buffers
+
+        gc.collect()
+        best_rate = 0.0
+        solves = 0
+        collections_before = sum(stats["collections"] for stats in gc.get_stats())
+        for _ in range(repeats):
+            start = time.perf_counter()
+            round_solves = 0
+            while time.perf_counter() - start < SERVING_ROUND_TIME:
+                run()
+                round_solves += 1
+            best_rate = max(best_rate, round_solves / (time.perf_counter() - start))
+            solves += round_solves
+        collections = sum(stats["collections"] for stats in gc.get_stats()) - collections_before
+
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        print(f"{engine:<8} {best_rate:>10.1f} {1000 * collections / solves:>18.1f} "
+              f"{(peak - baseline) / 1024:>14.1f}KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the solvers and compare against recorded history.")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES))
+    parser.add_argument("--families", nargs="+", choices=sorted(FAMILIES), default=sorted(FAMILIES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark.")
+    parser.add_argument("--window", type=int, default=5, help="Number of past runs the baseline is built from.")
+    parser.add_argument("--history", type=str, default=HISTORY_PATH, help="SQLite file the results are stored in.")
+    parser.add_argument("--no-save", action="store_true", help="Compare without recording this run.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 if anything regressed.")
+    parser.add_argument("--locality", type=int, metavar="SIZE", default=None,
+                        help="Only report how city renumbering affects traversal of a SIZE-city grid.")
+    parser.add_argument("--estimate", action="store_true",
+                        help="Only compare the sampled cost estimate with the exact answer on every family and size.")
+    parser.add_argument("--allocations", type=int, metavar="SIZE", default=None,
+                        help="Only compare throughput, GC runs and allocations of a reused Solver on SIZE cities.")
+    args = parser.parse_args()
+
+    if args.locality is not None:
+        locality_report(args.locality, args.repeats)
+        return
+    if args.estimate:
+        estimate_report(args.families, args.sizes, args.repeats)
+        return
+    if args.allocations is not None:
+        allocation_report(args.allocations, args.repeats)
+        return
+
+    commit = current_commit()
+    fingerprint = machine_fingerprint()
+    print(f"Commit {commit} on machine {fingerprint}\n")
+
+    measurements = run_benchmarks(args.engines, args.families, args.sizes, args.repeats)
+
+    connection = open_history(args.history)
+    try:
+        comparisons = [compare(connection, fingerprint, m, args.window) for m in measurements]
+        if not args.no_save:
+            for m in measurements:
+                record(connection, commit, fingerprint, m)
+    finally:
+        connection.close()
+
+    print_report(comparisons)
+    if args.fail_on_regression and any(c.status == "REGRESSION" for c in comparisons):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from array import array
+from typing import List, Sequence
+
+from costs import component_cost
+
+class BridgeIndex:
+    """
+    Answers "what is the minimum cost if road k is closed?" in O(1) per road.
+
+    Closing a road only changes the answer when the road is a bridge, i.e. the
+    only connection between two parts of its component. The index finds every
+    bridge with an iterative Tarjan low-link DFS, so deep graphs do not hit
+    Python's recursion limit, and records how many cities end up on each side.
+
+    Example:
+        >>> index = BridgeIndex(7, 3, 2, [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7]])
+        >>> index.base_cost, index.cost_without(3), index.cost_without(0)
+        (16, 17, 16)
+    """
+
+    def __init__(self, n: int, c_lib: int, c_road: int, city_edges: Sequence[Sequence[int]]) -> None:
+        self.n = n
+        self.c_lib = c_lib
+        self.c_road = c_road
+        self.num_edges = len(city_edges)
+
+        # For each bridge, the number of cities cut off on the child side and
+        # the size of the component it belongs to; both stay 0 for other roads
+        self.side_sizes = array('q', bytes(8 * self.num_edges))
+        self.component_sizes = array('q', bytes(8 * self.num_edges))
+
+        self.base_cost = self._index_bridges(city_edges)
+
+    def _index_bridges(self, city_edges: Sequence[Sequence[int]]) -> int:
+        n = self.n
+
+        # Adjacency in CSR form, remembering which road each entry came from
+        offsets = array('q', bytes(8 * (n + 2)))
+        for u, v in city_edges:
+            offsets[u + 1] += 1
+            offsets[v + 1] += 1
+        for city in range(1, n + 2):
+            offsets[city] += offsets[city - 1]
+        targets = array('q', bytes(8 * offsets[n + 1]))
+        road_ids = array('q', bytes(8 * offsets[n + 1]))
+        cursor = offsets[:]
+        for road, (u, v) in enumerate(city_edges):
+            targets[cursor[u]], road_ids[cursor[u]] = v, road
+            cursor[u] += 1
+            targets[cursor[v]], road_ids[cursor[v]] = u, road
+            cursor[v] += 1
+
+        discovered = [0] * (n + 1)
+        low = [0] * (n + 1)
+        subtree = [0] * (n + 1)
+        parent_road = [-1] * (n + 1)
+        position = offsets[:]
+        side_sizes = self.side_sizes
+        component_sizes = self.component_sizes
+
+        timer = 0
+        total_cost = 0
+        for root in range(1, n + 1):
+            if discovered[root]:
+                continue
+
+            timer += 1
+            discovered[root] = low[root] = timer
+            subtree[root] = 1
+            stack = [root]
+            component_bridges = []
+
+            while stack:
+                city = stack[-1]
+                if position[city] < offsets[city + 1]:
+                    i = position[city]
+                    position[city] += 1
+                    road = road_ids[i]
+                    if road == parent_road[city]:
+                        continue
+                    neighbor = targets[i]
+                    if discovered[neighbor]:
+                        # Back edge, including parallel roads and self-loops
+                        if discovered[neighbor] < low[city]:
+                            low[city] = discovered[neighbor]
+                    else:
+                        timer += 1
+                        discovered[neighbor] = low[neighbor] = timer
+                        subtree[neighbor] = 1
+                        parent_road[neighbor] = road
+                        stack.append(neighbor)
+                    continue
+
+                stack.pop()
+                if not stack:
+                    break
+                parent = stack[-1]
+                subtree[parent] += subtree[city]
+                if low[city] < low[parent]:
+                    low[parent] = low[city]
+                if low[city] > discovered[parent]:
+                    # Nothing below `city` reaches above `parent` without this road
+                    side_sizes[parent_road[city]] = subtree[city]
+                    component_bridges.append(parent_road[city])
+
+            size = subtree[root]
+            for road in component_bridges:
+                component_sizes[road] = size
+            total_cost += component_cost(size, self.c_lib, self.c_road)
+
+        return total_cost
+
+    def is_bridge(self, road: int) -> bool:
+        return self.side_sizes[road] > 0
+
+    def cost_without(self, road: int) -> int:
+        """
+        The minimum cost once road `road` (its index in `city_edges`) is closed.
+        """
+        side = self.side_sizes[road]
+        if not side:
+            return self.base_cost
+        size = self.component_sizes[road]
+        c_lib, c_road = self.c_lib, self.c_road
+        return (self.base_cost
+                - component_cost(size, c_lib, c_road)
+                + component_cost(side, c_lib, c_road)
+                + component_cost(size - side, c_lib, c_road))
+
+    def all_costs(self) -> List[int]:
+        """The minimum cost with each road closed in turn, for every road in one pass."""
+        return [self.cost_without(road) for road in range(self.num_edges)]
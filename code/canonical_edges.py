@@ -0,0 +1,92 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from array import array
+from collections.abc import Sequence as SequenceABC
+from typing import Iterator, List, NamedTuple, Sequence, Tuple, Union
+
+class EdgePairs(SequenceABC):
+    """
+    A read-only view of two edge arrays as a sequence of `(u, v)` pairs. It has a
+    length and can be indexed and iterated any number of times, like a list of roads.
+    """
+
+    __slots__ = ("us", "vs")
+
+    def __init__(self, us: array, vs: array) -> None:
+        self.us = us
+        self.vs = vs
+
+    def __len__(self) -> int:
+        return len(self.us)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[int, int], List[Tuple[int, int]]]:
+        if isinstance(index, slice):
+            return list(zip(self.us[index], self.vs[index]))
+        return self.us[index], self.vs[index]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.us, self.vs)
+
+class CanonicalEdges(NamedTuple):
+    """
+    A deduplicated edge list stored as two contiguous arrays of 64-bit city IDs.
+
+    Every edge has `us[i] < vs[i]`, and edges are sorted by `(u, v)`.
+    """
+    us: array
+    vs: array
+    self_loops: int
+    duplicates: int
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.us)
+
+    @property
+    def dropped(self) -> int:
+        return self.self_loops + self.duplicates
+
+    def pairs(self) -> EdgePairs:
+        """The edges as a sequence of `(u, v)` pairs, the shape every solver accepts."""
+        return EdgePairs(self.us, self.vs)
+
+def canonicalize_edges(city_edges: Sequence[Sequence[int]]) -> CanonicalEdges:
+    """
+    Normalizes every road to `(min, max)` order, drops self-loops and duplicate
+    roads, and packs the survivors into compact sorted arrays.
+
+    Each edge is packed into a single integer key `(u << bits) | v`, so the
+    deduplication and sort run on plain ints inside C rather than on tuples.
+
+    Args:
+        city_edges (Sequence[Sequence[int]]): Roads as pairs of city IDs, possibly
+            with duplicates in either orientation and `[u, u]` self-loops.
+
+    Returns:
+        CanonicalEdges: The unique roads and how many edges were dropped.
+
+    Example:
+        >>> edges = canonicalize_edges([[2, 1], [1, 2], [3, 3], [2, 3]])
+        >>> list(edges.pairs()), edges.self_loops, edges.duplicates
+        ([(1, 2), (2, 3)], 1, 1)
+    """
+    if not city_edges:
+        return CanonicalEdges(array('q'), array('q'), 0, 0)
+
+    bits = max(map(max, city_edges)).bit_length()
+    mask = (1 << bits) - 1
+
+    keys: List[int] = [
+        (u << bits) | v if u < v else (v << bits) | u
+        for u, v in city_edges
+        if u != v
+    ]
+    self_loops = len(city_edges) - len(keys)
+
+    unique = sorted(set(keys))
+    duplicates = len(keys) - len(unique)
+
+    us = array('q', [key >> bits for key in unique])
+    vs = array('q', [key & mask for key in unique])
+    return CanonicalEdges(us, vs, self_loops, duplicates)
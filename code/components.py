@@ -0,0 +1,115 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from array import array
+from typing import Iterable, Iterator, List, Sequence
+
+from renumbering import build_csr
+
+# The cheaper way to serve a component; a tie goes to libraries, which need no roads
+LIBRARIES = "libraries"
+ROADS = "roads"
+
+class CityGraph:
+    """The roads between cities 1..n in CSR form, shared by every summary it produces."""
+
+    __slots__ = ("n", "offsets", "targets")
+
+    def __init__(self, n: int, city_edges: Iterable[Sequence[int]]) -> None:
+        us = array('q')
+        vs = array('q')
+        for u, v in city_edges:
+            us.append(u)
+            vs.append(v)
+        self.n = n
+        self.offsets, self.targets = build_csr(n, us, vs)
+
+    def component_of(self, city: int) -> List[int]:
+        """The cities connected to `city`, in breadth-first order starting from it."""
+        offsets = self.offsets
+        targets = self.targets
+        seen = {city}
+        order = [city]
+        # `order` doubles as the BFS queue
+        for current_city in order:
+            for neighbor in targets[offsets[current_city]:offsets[current_city + 1]]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    order.append(neighbor)
+        return order
+
+class ComponentSummary:
+    """
+    One connected component: its lowest-numbered city, its size and how to serve it
+    at minimum cost. The member cities are only listed when `members()` is called.
+    """
+
+    __slots__ = ("representative", "size", "strategy", "cost", "_graph")
+
+    def __init__(self, representative: int, size: int, strategy: str, cost: int, graph: CityGraph) -> None:
+        self.representative = representative
+        self.size = size
+        self.strategy = strategy
+        self.cost = cost
+        self._graph = graph
+
+    def members(self) -> List[int]:
+        """Re-traverses the component from its representative, in O(size + roads)."""
+        return self._graph.component_of(self.representative)
+
+    def __repr__(self) -> str:
+        return (f"ComponentSummary(representative={self.representative}, size={self.size}, "
+                f"strategy={self.strategy!r}, cost={self.cost})")
+
+def iter_components(n: int, c_lib: int, c_road: int, city_edges: Iterable[Sequence[int]]) -> Iterator[ComponentSummary]:
+    """
+    Yields a summary of each connected component as soon as it has been traversed,
+    in order of representative city.
+
+    Only the adjacency and one visited mark per city are kept, so a consumer can
+    stop early or process components as they stream in without all of them being
+    held at once. The costs of all summaries add up to `roads_and_libraries`.
+
+    Args:
+        n (int): The number of cities.
+        c_lib (int): The cost to build a single library.
+        c_road (int): The cost to build a single road.
+        city_edges (Iterable[Sequence[int]]): Pairs of cities connected by a possible road.
+
+    Returns:
+        Iterator[ComponentSummary]: One summary per component.
+
+    Example:
+        >>> components = iter_components(7, 3, 2, [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7]])
+        >>> [(c.representative, c.size, c.strategy, c.cost) for c in components]
+        [(1, 4, 'roads', 9), (5, 3, 'roads', 7)]
+        >>> next(iter_components(7, 3, 2, [[5, 6], [6, 7]]), None).members()
+        [1]
+    """
+    graph = CityGraph(n, city_edges)
+    offsets = graph.offsets
+    targets = graph.targets
+    visited = bytearray(n + 1)
+
+    for city in range(1, n + 1):
+        if visited[city]:
+            continue
+
+        # Iterative DFS; only the count is kept, members() re-traverses on demand
+        visited[city] = 1
+        stack = [city]
+        size = 1
+        while stack:
+            current_city = stack.pop()
+            for neighbor in targets[offsets[current_city]:offsets[current_city + 1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    stack.append(neighbor)
+                    size += 1
+
+        cost_libs_in_all_cities = size * c_lib
+        cost_one_lib_with_roads = c_lib + (size - 1) * c_road
+        if cost_one_lib_with_roads < cost_libs_in_all_cities:
+            yield ComponentSummary(city, size, ROADS, cost_one_lib_with_roads, graph)
+        else:
+            yield ComponentSummary(city, size, LIBRARIES, cost_libs_in_all_cities, graph)
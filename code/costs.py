@@ -0,0 +1,13 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+def component_cost(size: int, c_lib: int, c_road: int) -> int:
+    """
+    The minimum cost of serving one connected component of `size` cities: the
+    cheaper of a library in every city or one library plus a spanning tree of roads.
+
+    Example:
+        >>> component_cost(4, 3, 2)
+        9
+    """
+    return min(size * c_lib, c_lib + (size - 1) * c_road)
@@ -0,0 +1,214 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from itertools import combinations
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Components up to this size get a provably minimal set of libraries
+DEFAULT_EXACT_LIMIT = 12
+
+def _ball_masks(members: List[int], offsets: List[int], targets: List[int], k: int) -> List[int]:
+    """For every member of a component, the bitmask of members within k roads of it."""
+    local = {city: i for i, city in enumerate(members)}
+    masks = []
+    for source in members:
+        mask = 1 << local[source]
+        depth = {source: 0}
+        frontier = [source]
+        for distance in range(1, k + 1):
+            next_frontier = []
+            for city in frontier:
+                for neighbor in targets[offsets[city]:offsets[city + 1]]:
+                    if neighbor not in depth:
+                        depth[neighbor] = distance
+                        mask |= 1 << local[neighbor]
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        masks.append(mask)
+    return masks
+
+def _exact_libraries(members: List[int], offsets: List[int], targets: List[int], k: int) -> List[int]:
+    """The fewest members such that every member is within k roads of one, by exhaustive search."""
+    masks = _ball_masks(members, offsets, targets, k)
+    everyone = (1 << len(members)) - 1
+    for count in range(1, len(members) + 1):
+        for chosen in combinations(range(len(members)), count):
+            covered = 0
+            for i in chosen:
+                covered |= masks[i]
+            if covered == everyone:
+                return [members[i] for i in chosen]
+    return list(members)
+
+def place_libraries(
+    n: int,
+    city_edges: Iterable[Sequence[int]],
+    k: Optional[int],
+    exact_limit: int = DEFAULT_EXACT_LIMIT
+) -> List[int]:
+    """
+    Chooses library cities so that every city is within `k` roads of a library.
+
+    Every component is spanned by a breadth-first tree. Cities are then taken from the
+    deepest up, and each one still uncovered gets a library at its k-th ancestor in
+    the tree (or at the root, if it is shallower). That library covers the city and
+    everything else within k roads of it; the rule is optimal on trees. Coverage is kept
+    as one distance per city: each new library runs a breadth-first search that only
+    continues where it brings a city closer to a library than before, so the searches
+    of all libraries together behave like a single multi-source BFS.
+
+    Components of at most `exact_limit` cities are instead solved exactly, by trying
+    every smaller set of libraries first.
+
+    Args:
+        n (int): The number of cities.
+        city_edges (Iterable[Sequence[int]]): Pairs of cities connected by a possible road.
+        k (Optional[int]): The most roads between a city and its library; None for no limit.
+        exact_limit (int): Largest component solved by exhaustive search.
+
+    Returns:
+        List[int]: The library cities, grouped by component.
+
+    Example:
+        >>> place_libraries(7, [[1, 2], [2, 3], [3, 4], [4, 5], [5, 6], [6, 7]], k=1, exact_limit=0)
+        [6, 3, 1]
+    """
+    return [library for _, libraries in _component_libraries(n, city_edges, k, exact_limit) for library in libraries]
+
+def _component_libraries(
+    n: int,
+    city_edges: Iterable[Sequence[int]],
+    k: Optional[int],
+    exact_limit: int
+) -> List[Tuple[int, List[int]]]:
+    """The size and the library cities of every component, as chosen by `place_libraries`."""
+    # CSR adjacency in plain lists, which index faster than arrays boxing every value
+    edges = [(u, v) for u, v in city_edges]
+    offsets = [0] * (n + 2)
+    for u, v in edges:
+        offsets[u + 1] += 1
+        offsets[v + 1] += 1
+    for city in range(1, n + 2):
+        offsets[city] += offsets[city - 1]
+    targets = [0] * offsets[n + 1]
+    cursor = offsets[:]
+    for u, v in edges:
+        targets[cursor[u]] = v
+        cursor[u] += 1
+        targets[cursor[v]] = u
+        cursor[v] += 1
+
+    if k is None or k >= n:
+        k = n
+
+    # Breadth-first trees: `order` lists each component's cities in BFS order, contiguously
+    parent = [0] * (n + 1)
+    visited = bytearray(n + 1)
+    order: List[int] = []
+    starts: List[int] = []
+    for root in range(1, n + 1):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        parent[root] = root
+        component = [root]
+        # `component` doubles as the BFS queue
+        for city in component:
+            for neighbor in targets[offsets[city]:offsets[city + 1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    parent[neighbor] = city
+                    component.append(neighbor)
+        starts.append(len(order))
+        order.extend(component)
+    starts.append(len(order))
+
+    # Roads from each city to its nearest library so far; k + 1 stands for "uncovered"
+    uncovered = k + 1
+    distance = [uncovered] * (n + 1)
+    components: List[Tuple[int, List[int]]] = []
+
+    for component in range(len(starts) - 1):
+        start, end = starts[component], starts[component + 1]
+        if end - start <= exact_limit:
+            components.append((end - start, _exact_libraries(order[start:end], offsets, targets, k)))
+            continue
+
+        libraries: List[int] = []
+
+        # Reverse BFS order visits every city after all deeper ones in its tree
+        for i in range(end - 1, start - 1, -1):
+            city = order[i]
+            if distance[city] <= k:
+                continue
+
+            library = city
+            for _ in range(k):
+                if parent[library] == library:
+                    break
+                library = parent[library]
+            libraries.append(library)
+
+            # Pruned BFS: only cities this library brings closer are expanded
+            distance[library] = 0
+            frontier = [library]
+            for hops in range(1, k + 1):
+                next_frontier = []
+                for current_city in frontier:
+                    for neighbor in targets[offsets[current_city]:offsets[current_city + 1]]:
+                        if distance[neighbor] > hops:
+                            distance[neighbor] = hops
+                            next_frontier.append(neighbor)
+                if not next_frontier:
+                    break
+                frontier = next_frontier
+        components.append((end - start, libraries))
+
+    return components
+
+def roads_and_libraries_within(
+    n: int,
+    c_lib: int,
+    c_road: int,
+    city_edges: List[List[int]],
+    k: Optional[int],
+    exact_limit: int = DEFAULT_EXACT_LIMIT
+) -> int:
+    """
+    Determines the cost of giving every citizen of HackerLand a library at most `k`
+    roads away.
+
+    A component of s cities served by L libraries needs at least s - L roads, and
+    exactly that many suffice when every city is within k roads of a library: each
+    city joins its nearest library along a shortest path. So each component costs
+    `min(s * c_lib, L * c_lib + (s - L) * c_road)`, with L from `place_libraries`.
+    With `k=None`, L is 1 and this is `roads_and_libraries`. Larger components use
+    the greedy placement, so their cost is an upper bound on the optimum.
+
+    Args:
+        n (int): The number of cities.
+        c_lib (int): The cost to build a single library.
+        c_road (int): The cost to build a single road.
+        city_edges (List[List[int]]): A list of edges representing possible roads between cities.
+        k (Optional[int]): The most roads between a citizen and their library; None for no limit.
+        exact_limit (int): Largest component solved by exhaustive search.
+
+    Returns:
+        int: The total cost of the placement.
+
+    Example:
+        >>> city_edges = [[1, 2], [2, 3], [3, 4], [4, 5], [5, 6], [6, 7]]
+        >>> roads_and_libraries_within(7, 3, 1, city_edges, k=None), roads_and_libraries_within(7, 3, 1, city_edges, k=1)
+        (9, 13)
+    """
+    if c_road >= c_lib:
+        # A library in every city is optimal, and covers everyone at distance 0
+        return n * c_lib
+
+    total_cost = 0
+    for size, libraries in _component_libraries(n, city_edges, k, exact_limit):
+        count = len(libraries)
+        total_cost += min(size * c_lib, count * c_lib + (size - count) * c_road)
+    return total_cost
@@ -0,0 +1,154 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import math
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from components import CityGraph
+
+DEFAULT_SAMPLES = 10000
+DEFAULT_MAX_EXPLORE = 128
+DEFAULT_CONFIDENCE = 0.95
+
+class CostEstimate(NamedTuple):
+    """An estimated minimum cost, with bounds that hold together with probability `confidence`."""
+    estimate: float
+    lower: float
+    upper: float
+    components: float
+    components_lower: float
+    components_upper: float
+    samples: int
+    confidence: float
+
+    @property
+    def relative_width(self) -> float:
+        """Half the width of the interval, relative to the estimate."""
+        return (self.upper - self.lower) / (2 * self.estimate) if self.estimate else 0.0
+
+def _bernstein_radius(values: List[float], delta: float) -> float:
+    """
+    How far the mean of independent values in [0, 1] may be from its expectation on
+    one side, with probability at least 1 - delta: the empirical Bernstein bound of
+    Maurer and Pontil. It shrinks with the sample variance, so it is tight when most
+    samples agree.
+    """
+    k = len(values)
+    if k < 2:
+        return 1.0
+    mean = sum(values) / k
+    variance = sum((value - mean) ** 2 for value in values) / (k - 1)
+    log_term = math.log(2 / delta)
+    return math.sqrt(2 * variance * log_term / k) + 7 * log_term / (3 * (k - 1))
+
+def estimate_cost(
+    graph: CityGraph,
+    c_lib: int,
+    c_road: int,
+    samples: Optional[int] = DEFAULT_SAMPLES,
+    time_budget: Optional[float] = None,
+    max_explore: int = DEFAULT_MAX_EXPLORE,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: Optional[int] = None
+) -> CostEstimate:
+    """
+    Estimates the minimum cost without visiting the whole graph, in the style of
+    Chazelle, Rubinfeld and Trevisan's component-count estimator.
+
+    With roads cheaper than libraries, the optimum is one library per component plus
+    a spanning tree of roads, so `cost = n * c_road + (c_lib - c_road) * C` for C
+    components. Since every city of a component of size s contributes 1 / s to C,
+    `C = n * E[1 / size(u)]` for a uniformly random city u. Each sample therefore
+    runs a breadth-first search from a random city that stops after `max_explore`
+    cities. A component too large to finish contributes somewhere between 0 and
+    `1 / (max_explore + 1)`; the estimate uses 0 and the bounds use both ends.
+
+    The work is O(samples * max_explore) whatever the size of the graph. Cities seen
+    by earlier searches are remembered, so samples in known components are free.
+
+    Args:
+        graph (CityGraph): The road network, whose adjacency is read on demand.
+        c_lib (int): The cost to build a single library.
+        c_road (int): The cost to build a single road.
+        samples (Optional[int]): Maximum number of sampled cities; None for no limit.
+        time_budget (Optional[float]): Seconds after which sampling stops; None for no limit.
+        max_explore (int): Cities each search may visit before giving up on a component.
+        confidence (float): Probability that the bounds hold.
+        seed (Optional[int]): Seed for the sampled cities.
+
+    Returns:
+        CostEstimate: The estimated cost and number of components, with their bounds.
+
+    Example:
+        >>> graph = CityGraph(7, [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7]])
+        >>> estimate = estimate_cost(graph, 3, 2, samples=200, seed=1)
+        >>> estimate.lower <= 16 <= estimate.upper
+        True
+    """
+    n = graph.n
+    if n == 0:
+        return CostEstimate(0, 0, 0, 0, 0, 0, 0, confidence)
+    if samples is None and time_budget is None:
+        raise ValueError("Give a sample budget, a time budget or both.")
+
+    offsets = graph.offsets
+    targets = graph.targets
+    rng = random.Random(seed)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    # Size of the component of every city explored so far; 0 for "larger than max_explore"
+    known: Dict[int, int] = {}
+    low: List[float] = []
+    high: List[float] = []
+    too_large = 1 / (max_explore + 1)
+
+    while samples is None or len(low) < samples:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+        city = rng.randint(1, n)
+        size = known.get(city)
+        if size is None:
+            seen = {city}
+            order = [city]
+            # `order` doubles as the BFS queue
+            for current_city in order:
+                for neighbor in targets[offsets[current_city]:offsets[current_city + 1]]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        order.append(neighbor)
+                if len(order) > max_explore:
+                    break
+            size = len(order) if len(order) <= max_explore else 0
+            for explored in order:
+                known[explored] = size
+
+        if size:
+            low.append(1 / size)
+            high.append(1 / size)
+        else:
+            low.append(0.0)
+            high.append(too_large)
+
+    if not low:
+        raise ValueError("The budget ran out before a single city was sampled.")
+
+    # Split the failure probability between the two one-sided bounds
+    delta = (1 - confidence) / 2
+    components_lower = max(1.0, n * (sum(low) / len(low) - _bernstein_radius(low, delta)))
+    components_upper = min(float(n), n * (sum(high) / len(high) + _bernstein_radius(high, delta)))
+    components = min(max(n * sum(low) / len(low), components_lower), components_upper)
+
+    def cost(num_components: float) -> float:
+        if c_road >= c_lib:
+            # A library in every city is optimal, whatever the components
+            return n * c_lib
+        return n * c_road + (c_lib - c_road) * num_components
+
+    return CostEstimate(
+        cost(components), cost(components_lower), cost(components_upper),
+        components, components_lower, components_upper,
+        len(low), confidence
+    )
@@ -0,0 +1,247 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import shutil
+import tempfile
+from array import array
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterator, Optional, Set
+
+# Records are int64 triples (kind, a, b): an edge between cities a and b, or a
+# weight record saying that city a stands for b more cities contracted into it.
+EDGE = 0
+WEIGHT = 1
+RECORD_SIZE = 3
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_MAX_LABELS = 1 << 20
+
+def read_text_chunks(path: str, chunk_size: int) -> Iterator[array]:
+    """Streams a text file of `u v` lines as chunks of edge records."""
+    with open(path, 'r') as file:
+        while True:
+            lines = list(islice(file, chunk_size))
+            if not lines:
+                return
+            chunk = array('q')
+            for line in lines:
+                fields = line.split()
+                if fields:
+                    chunk.extend((EDGE, int(fields[0]), int(fields[1])))
+            yield chunk
+
+def read_record_chunks(path: str, chunk_size: int) -> Iterator[array]:
+    """Streams a binary spill file as chunks of at most `chunk_size` records."""
+    with open(path, 'rb') as file:
+        while True:
+            chunk = array('q')
+            try:
+                chunk.fromfile(file, chunk_size * RECORD_SIZE)
+            except EOFError:
+                # Whatever was left before the end of the file is still in `chunk`
+                pass
+            if not chunk:
+                return
+            yield chunk
+
+class _LabelTable:
+    """A union-find over at most `max_labels` cities, tracking component sizes."""
+
+    def __init__(self, max_labels: int) -> None:
+        self.max_labels = max_labels
+        self.parent: Dict[int, int] = {}
+        self.size: Dict[int, int] = {}
+
+    def room(self) -> int:
+        return self.max_labels - len(self.parent)
+
+    def add(self, city: int, size: int = 1) -> None:
+        self.parent[city] = city
+        self.size[city] = size
+
+    def find(self, city: int) -> int:
+        parent = self.parent
+        while parent[city] != city:
+            parent[city] = parent[parent[city]]
+            city = parent[city]
+        return city
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size.pop(b)
+
+def _contract(chunks: Iterator[array], table: _LabelTable, spill: str) -> None:
+    """
+    Folds as many records as fit into the label table and writes the rest,
+    untouched, to `spill`.
+    """
+    parent = table.parent
+    with open(spill, 'wb') as out:
+        for chunk in chunks:
+            spilled = array('q')
+            for i in range(0, len(chunk), RECORD_SIZE):
+                kind, a, b = chunk[i], chunk[i + 1], chunk[i + 2]
+                if kind == WEIGHT:
+                    if a in parent:
+                        table.size[table.find(a)] += b
+                    elif table.room() >= 1:
+                        table.add(a, 1 + b)
+                    else:
+                        spilled.extend((kind, a, b))
+                    continue
+
+                missing = (a not in parent) + (b not in parent and b != a)
+                if missing > table.room():
+                    spilled.extend((kind, a, b))
+                    continue
+                if a not in parent:
+                    table.add(a)
+                if b not in parent:
+                    table.add(b)
+                table.union(a, b)
+            spilled.tofile(out)
+
+def _relabel(table: _LabelTable, spill: str, edges_out: str, weights_out: str, chunk_size: int) -> Set[int]:
+    """
+    Rewrites the spilled records in terms of the label table's roots. Edges
+    go to `edges_out` and weight records to `weights_out`, so that the next
+    pass always starts on an edge.
+
+    Returns:
+        Set[int]: The roots that are still referenced by a spilled record.
+    """
+    parent = table.parent
+    touched: Set[int] = set()
+    with open(edges_out, 'wb') as edges_file, open(weights_out, 'wb') as weights_file:
+        for chunk in read_record_chunks(spill, chunk_size):
+            edges = array('q')
+            weights = array('q')
+            for i in range(0, len(chunk), RECORD_SIZE):
+                kind, a, b = chunk[i], chunk[i + 1], chunk[i + 2]
+                if kind == WEIGHT:
+                    if a in parent:
+                        table.size[table.find(a)] += b
+                    else:
+                        weights.extend((kind, a, b))
+                    continue
+
+                if a in parent:
+                    a = table.find(a)
+                if b in parent:
+                    b = table.find(b)
+                if a == b and a in parent:
+                    continue
+                if a in parent:
+                    touched.add(a)
+                if b in parent:
+                    touched.add(b)
+                edges.extend((kind, a, b))
+            edges.tofile(edges_file)
+            weights.tofile(weights_file)
+    return touched
+
+def component_histogram_external(
+    edge_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_labels: int = DEFAULT_MAX_LABELS,
+    tmp_dir: Optional[str] = None
+) -> Dict[int, int]:
+    """
+    Computes the sizes of the connected components of an edge list that may not
+    fit in memory.
+
+    The edge file is streamed in chunks of `chunk_size` lines. Each pass contracts
+    as many edges as fit into a union-find over at most `max_labels` cities and
+    spills the rest to a temporary file. Spilled edges are then relabelled to their
+    component's representative, and the representative carries the component's size
+    as a weight record. Components no longer referenced by any spilled record are
+    final. Passes repeat on the spill file until nothing is left. Memory is bounded
+    by `max_labels` table entries plus one chunk of records, whatever the file size.
+
+    Only cities that appear in the edge file are counted.
+
+    Args:
+        edge_path (str): Text file with one road `u v` per line.
+        chunk_size (int): Number of records read into memory at a time.
+        max_labels (int): Maximum number of cities held in the label table.
+        tmp_dir (Optional[str]): Where spill files are written.
+
+    Returns:
+        Dict[int, int]: Maps a component size to the number of components that size.
+    """
+    if max_labels < 2:
+        raise ValueError("max_labels must allow at least one edge (2 labels).")
+
+    histogram: Counter = Counter()
+    work_dir = tempfile.mkdtemp(prefix="components-", dir=tmp_dir)
+    try:
+        chunks = read_text_chunks(edge_path, chunk_size)
+        generation = 0
+        while True:
+            table = _LabelTable(max_labels)
+            spill = os.path.join(work_dir, f"spill-{generation}.bin")
+            _contract(chunks, table, spill)
+
+            edges_path = os.path.join(work_dir, f"edges-{generation}.bin")
+            weights_path = os.path.join(work_dir, f"weights-{generation}.bin")
+            touched = _relabel(table, spill, edges_path, weights_path, chunk_size)
+            os.remove(spill)
+
+            # Finished components are counted; the rest carry their size forward
+            carried = array('q')
+            for city, parent in table.parent.items():
+                if city != parent:
+                    continue
+                if city in touched:
+                    carried.extend((WEIGHT, city, table.size[city] - 1))
+                else:
+                    histogram[table.size[city]] += 1
+            with open(weights_path, 'ab') as weights_file:
+                carried.tofile(weights_file)
+
+            if os.path.getsize(edges_path) == 0 and os.path.getsize(weights_path) == 0:
+                break
+
+            # The next pass reads every remaining edge before any weight record
+            def next_chunks(edges_path: str = edges_path, weights_path: str = weights_path) -> Iterator[array]:
+                yield from read_record_chunks(edges_path, chunk_size)
+                yield from read_record_chunks(weights_path, chunk_size)
+            chunks = next_chunks()
+            generation += 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return dict(histogram)
+
+def roads_and_libraries_external(
+    n: int,
+    c_lib: int,
+    c_road: int,
+    edge_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_labels: int = DEFAULT_MAX_LABELS,
+    tmp_dir: Optional[str] = None
+) -> int:
+    """
+    Determines the minimum cost to provide library access to all citizens of HackerLand
+    for a road list stored in `edge_path`, under a bounded memory budget.
+
+    See `component_histogram_external` for the meaning of the tuning arguments.
+
+    Returns:
+        int: The minimal total cost to ensure all citizens have access to a library.
+    """
+    histogram = component_histogram_external(edge_path, chunk_size, max_labels, tmp_dir)
+
+    touched = sum(size * count for size, count in histogram.items())
+    total_cost = (n - touched) * c_lib
+    for size, count in histogram.items():
+        total_cost += count * min(size * c_lib, c_lib + (size - 1) * c_road)
+    return total_cost
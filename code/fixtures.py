@@ -0,0 +1,186 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import argparse
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import random
+import sys
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from canonical_edges import canonicalize_edges
+from solution import roads_and_libraries
+
+# Bump whenever the generators or the file layout change, then regenerate
+CORPUS_VERSION = 1
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MANIFEST_PATH = os.path.join(FIXTURES_DIR, "manifest.json")
+CACHE_DIR = os.path.join(FIXTURES_DIR, ".cache")
+
+def _random_roads(n: int, m: int, rng: random.Random) -> List[List[int]]:
+    return [[rng.randint(1, n), rng.randint(1, n)] for _ in range(m)]
+
+def _shuffled_path(n: int, rng: random.Random) -> List[List[int]]:
+    cities = list(range(1, n + 1))
+    rng.shuffle(cities)
+    return [[u, v] for u, v in zip(cities, cities[1:])]
+
+def _small_components(n: int, rng: random.Random) -> List[List[int]]:
+    edges = []
+    for start in range(1, n + 1, 5):
+        members = list(range(start, min(start + 5, n + 1)))
+        for i in range(1, len(members)):
+            edges.append([members[rng.randrange(i)], members[i]])
+    return edges
+
+class FixtureSpec(NamedTuple):
+    n: int
+    c_lib: int
+    c_road: int
+    seed: int
+    generate: Callable[[int, random.Random], List[List[int]]]
+
+FIXTURE_SPECS: Dict[str, FixtureSpec] = {
+    "random-50k": FixtureSpec(50000, 5, 2, 1, lambda n, rng: _random_roads(n, 2 * n, rng)),
+    "sparse-100k": FixtureSpec(100000, 3, 1, 2, lambda n, rng: _random_roads(n, 3 * n // 5, rng)),
+    "path-50k": FixtureSpec(50000, 7, 3, 3, _shuffled_path),
+    "clusters-100k": FixtureSpec(100000, 4, 1, 4, _small_components),
+}
+
+class Fixture:
+    """
+    A stored graph with its precomputed answer. The edges are only decompressed
+    and memory-mapped the first time they are used.
+    """
+
+    def __init__(self, name: str, entry: Dict) -> None:
+        self.name = name
+        self.n: int = entry["n"]
+        self.c_lib: int = entry["c_lib"]
+        self.c_road: int = entry["c_road"]
+        self.num_edges: int = entry["num_edges"]
+        self.answer: int = entry["answer"]
+        self.histogram: Dict[int, int] = {int(size): count for size, count in entry["histogram"].items()}
+        self._archive = os.path.join(FIXTURES_DIR, entry["edges"])
+        self._sha256: str = entry["sha256"]
+        self._mmap = None
+
+    def _cache_path(self) -> str:
+        return os.path.join(CACHE_DIR, f"{self.name}-v{CORPUS_VERSION}-{self._sha256[:16]}.bin")
+
+    @property
+    def edges(self) -> memoryview:
+        """The roads as a flat int32 view `[u0, v0, u1, v1, ...]` over the mapped file."""
+        if self._mmap is None:
+            path = self._cache_path()
+            if not os.path.exists(path):
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with gzip.open(self._archive, 'rb') as source:
+                    data = source.read()
+                if hashlib.sha256(data).hexdigest() != self._sha256:
+                    raise ValueError(f"Fixture {self.name} does not match its manifest; regenerate the corpus.")
+                partial = f"{path}.{os.getpid()}.tmp"
+                with open(partial, 'wb') as file:
+                    file.write(data)
+                os.replace(partial, path)
+            if self.num_edges == 0:
+                return memoryview(array('i'))
+            with open(path, 'rb') as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap).cast('i')
+
+    def pairs(self) -> Iterator[Tuple[int, int]]:
+        flat = self.edges
+        return zip(flat[0::2], flat[1::2])
+
+    def city_edges(self) -> List[List[int]]:
+        """The roads in the `List[List[int]]` shape `roads_and_libraries` takes."""
+        flat = self.edges.tolist()
+        return [flat[i:i + 2] for i in range(0, len(flat), 2)]
+
+def load_fixtures() -> Dict[str, Fixture]:
+    """Reads the manifest; no edge data is touched until a fixture's edges are used."""
+    if sys.byteorder != "little":
+        raise RuntimeError("The fixture corpus is stored little-endian.")
+    with open(MANIFEST_PATH, 'r') as file:
+        manifest = json.load(file)
+    if manifest["version"] != CORPUS_VERSION:
+        raise ValueError(f"Fixture corpus is version {manifest['version']}, expected {CORPUS_VERSION}; regenerate it.")
+    return {name: Fixture(name, entry) for name, entry in manifest["fixtures"].items()}
+
+def component_histogram(n: int, us: array, vs: array) -> Dict[int, int]:
+    """Component sizes of cities 1..n, as `size -> count`."""
+    parent = list(range(n + 1))
+    for u, v in zip(us, vs):
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        if u != v:
+            parent[u] = v
+
+    sizes = Counter()
+    for city in range(1, n + 1):
+        root = city
+        while parent[root] != root:
+            root = parent[root]
+        sizes[root] += 1
+    return dict(sorted(Counter(sizes.values()).items()))
+
+def regenerate() -> None:
+    """Rebuilds every fixture from its spec and recomputes the answers with `solution.py`."""
+    if sys.byteorder != "little":
+        raise RuntimeError("The fixture corpus is stored little-endian.")
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    fixtures = {}
+    for name, spec in FIXTURE_SPECS.items():
+        canonical = canonicalize_edges(spec.generate(spec.n, random.Random(spec.seed)))
+
+        flat = array('i', bytes(4 * 2 * canonical.num_edges))
+        flat[0::2] = array('i', canonical.us)
+        flat[1::2] = array('i', canonical.vs)
+        data = flat.tobytes()
+
+        archive = f"{name}.edges.gz"
+        # A fixed mtime keeps the archives byte-identical across regenerations
+        with open(os.path.join(FIXTURES_DIR, archive), 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9, mtime=0) as file:
+                file.write(data)
+
+        fixtures[name] = {
+            "n": spec.n,
+            "c_lib": spec.c_lib,
+            "c_road": spec.c_road,
+            "num_edges": canonical.num_edges,
+            "answer": roads_and_libraries(spec.n, spec.c_lib, spec.c_road, canonical.pairs()),
+            "histogram": component_histogram(spec.n, canonical.us, canonical.vs),
+            "edges": archive,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        print(f"{name}: n={spec.n}, {canonical.num_edges} roads, answer {fixtures[name]['answer']}")
+
+    with open(MANIFEST_PATH, 'w') as file:
+        json.dump({"version": CORPUS_VERSION, "fixtures": fixtures}, file, indent=2)
+        file.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the golden-answer fixture corpus.")
+    parser.add_argument("command", choices=["regenerate", "list"])
+    args = parser.parse_args()
+
+    if args.command == "regenerate":
+        regenerate()
+    else:
+        for name, fixture in load_fixtures().items():
+            print(f"{name}: n={fixture.n}, {fixture.num_edges} roads, answer {fixture.answer}")
+
+if __name__ == "__main__":
+    main()
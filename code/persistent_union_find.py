@@ -0,0 +1,197 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from array import array
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence
+
+from costs import component_cost
+
+# Forks stack at most this many frozen layers before they are merged into one,
+# so lookups never walk a chain longer than this
+MAX_LAYERS = 8
+
+class _Layer(NamedTuple):
+    """A frozen set of union-find changes, stacked on top of the layer below it."""
+    parent: Dict[int, int]
+    size: Dict[int, int]
+    below: Optional["_Layer"]
+    depth: int
+
+def _flatten(layer: _Layer) -> _Layer:
+    """Merges a chain of layers into a single one, upper layers taking precedence."""
+    chain = []
+    while layer is not None:
+        chain.append(layer)
+        layer = layer.below
+    parent: Dict[int, int] = {}
+    size: Dict[int, int] = {}
+    for frozen in reversed(chain):
+        parent.update(frozen.parent)
+        size.update(frozen.size)
+    return _Layer(parent, size, None, 1)
+
+class BaseNetwork:
+    """
+    The solved base road network that scenarios are forked from.
+
+    Every city's root is flattened into `roots`, so the base is never modified
+    again and any number of scenarios can read it concurrently.
+
+    Example:
+        >>> base = BaseNetwork(7, 3, 2, [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7]])
+        >>> scenario = base.fork()
+        >>> scenario.add_edge(4, 7)
+        True
+        >>> base.cost, scenario.cost
+        (16, 15)
+    """
+
+    def __init__(self, n: int, c_lib: int, c_road: int, city_edges: Iterable[Sequence[int]]) -> None:
+        self.n = n
+        self.c_lib = c_lib
+        self.c_road = c_road
+
+        parent = list(range(n + 1))
+        sizes = [1] * (n + 1)
+        for u, v in city_edges:
+            while parent[u] != u:
+                parent[u] = parent[parent[u]]
+                u = parent[u]
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            if u == v:
+                continue
+            if sizes[u] < sizes[v]:
+                u, v = v, u
+            parent[v] = u
+            sizes[u] += sizes[v]
+
+        self.roots = array('q', bytes(8 * (n + 1)))
+        self.sizes = array('q', bytes(8 * (n + 1)))
+        self.cost = 0
+        for city in range(1, n + 1):
+            root = city
+            while parent[root] != root:
+                root = parent[root]
+            self.roots[city] = root
+            if root == city:
+                self.sizes[city] = sizes[city]
+                self.cost += component_cost(sizes[city], c_lib, c_road)
+
+    def fork(self) -> "Scenario":
+        return Scenario(self, None, self.cost)
+
+class Scenario:
+    """
+    A branch of a `BaseNetwork` that adds roads without changing the base or any
+    other scenario.
+
+    The scenario's union-find works on the base components' roots and stores only
+    what it changes, in dictionaries: memory grows with the roads the scenario
+    adds, not with `n`. Forking a scenario freezes its changes so far into a
+    shared layer that both branches read through, so a fork is usually O(1). Once
+    `MAX_LAYERS` layers are stacked, the next fork merges them into one, which costs
+    time and memory proportional to the entries of the whole chain but keeps every
+    lookup at a bounded number of dictionary probes.
+    """
+
+    __slots__ = ("base", "cost", "_parent", "_size", "_below")
+
+    def __init__(self, base: BaseNetwork, below: Optional[_Layer], cost: int) -> None:
+        self.base = base
+        self.cost = cost
+        self._parent: Dict[int, int] = {}
+        self._size: Dict[int, int] = {}
+        self._below = below
+
+    def _get_parent(self, root: int) -> int:
+        parent = self._parent.get(root)
+        if parent is not None:
+            return parent
+        layer = self._below
+        while layer is not None:
+            parent = layer.parent.get(root)
+            if parent is not None:
+                return parent
+            layer = layer.below
+        return root
+
+    def _get_size(self, root: int) -> int:
+        size = self._size.get(root)
+        if size is not None:
+            return size
+        layer = self._below
+        while layer is not None:
+            size = layer.size.get(root)
+            if size is not None:
+                return size
+            layer = layer.below
+        return self.base.sizes[root]
+
+    def find(self, city: int) -> int:
+        """The representative of `city`'s component in this scenario."""
+        node = self.base.roots[city]
+        parent = self._get_parent(node)
+        own = self._parent
+        while parent != node:
+            grandparent = self._get_parent(parent)
+            # Path halving, only on this scenario's own entries: copying a frozen
+            # entry would grow the scenario on read-only queries
+            if grandparent != parent and node in own:
+                own[node] = grandparent
+            node, parent = grandparent, self._get_parent(grandparent)
+        return node
+
+    def connected(self, u: int, v: int) -> bool:
+        return self.find(u) == self.find(v)
+
+    def component_size(self, city: int) -> int:
+        return self._get_size(self.find(city))
+
+    def add_edge(self, u: int, v: int) -> bool:
+        """
+        Adds a road between `u` and `v` and updates `cost`.
+
+        Returns:
+            bool: Whether the road joined two components.
+        """
+        a, b = self.find(u), self.find(v)
+        if a == b:
+            return False
+        size_a, size_b = self._get_size(a), self._get_size(b)
+        if size_a < size_b:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] = size_a + size_b
+
+        c_lib, c_road = self.base.c_lib, self.base.c_road
+        self.cost += (component_cost(size_a + size_b, c_lib, c_road)
+                      - component_cost(size_a, c_lib, c_road)
+                      - component_cost(size_b, c_lib, c_road))
+        return True
+
+    def add_edges(self, city_edges: Iterable[Sequence[int]]) -> int:
+        """Adds every road in `city_edges` and returns the new cost."""
+        for u, v in city_edges:
+            self.add_edge(u, v)
+        return self.cost
+
+    def fork(self) -> "Scenario":
+        if self._parent or self._size:
+            depth = 1 if self._below is None else self._below.depth + 1
+            self._below = _Layer(self._parent, self._size, self._below, depth)
+            if depth > MAX_LAYERS:
+                self._below = _flatten(self._below)
+            self._parent = {}
+            self._size = {}
+        return Scenario(self.base, self._below, self.cost)
+
+    def delta_size(self) -> int:
+        """The number of union-find entries this scenario stores on top of the base, including frozen layers."""
+        entries = len(self._parent) + len(self._size)
+        layer = self._below
+        while layer is not None:
+            entries += len(layer.parent) + len(layer.size)
+            layer = layer.below
+        return entries
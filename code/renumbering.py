@@ -0,0 +1,163 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from array import array
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+def build_csr(n: int, us: Sequence[int], vs: Sequence[int]) -> Tuple[array, array]:
+    """
+    Builds the compressed sparse row adjacency of an undirected graph on cities 1..n.
+
+    Returns:
+        Tuple[array, array]: `offsets` of length n + 2 and `targets` of length 2m,
+        where the neighbors of city c are `targets[offsets[c]:offsets[c + 1]]`.
+    """
+    offsets = array('q', bytes(8 * (n + 2)))
+    for u, v in zip(us, vs):
+        offsets[u + 1] += 1
+        offsets[v + 1] += 1
+    for city in range(1, n + 2):
+        offsets[city] += offsets[city - 1]
+
+    targets = array('q', bytes(8 * offsets[n + 1]))
+    cursor = offsets[:]
+    for u, v in zip(us, vs):
+        targets[cursor[u]] = v
+        cursor[u] += 1
+        targets[cursor[v]] = u
+        cursor[v] += 1
+    return offsets, targets
+
+def _degree(offsets: array, city: int) -> int:
+    return offsets[city + 1] - offsets[city]
+
+def bfs_order(n: int, offsets: array, targets: array) -> List[int]:
+    """Visits the cities breadth-first, one component after another."""
+    visited = bytearray(n + 1)
+    order: List[int] = []
+    for start in range(1, n + 1):
+        if visited[start]:
+            continue
+        visited[start] = 1
+        queue = deque([start])
+        while queue:
+            city = queue.popleft()
+            order.append(city)
+            for neighbor in targets[offsets[city]:offsets[city + 1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    queue.append(neighbor)
+    return order
+
+def rcm_order(n: int, offsets: array, targets: array) -> List[int]:
+    """
+    Reverse Cuthill-McKee: a breadth-first order that starts every component at a
+    city of minimum degree and enqueues neighbors by increasing degree, reversed.
+    It keeps neighboring cities close together in the numbering.
+    """
+    degree = [_degree(offsets, city) for city in range(n + 1)]
+    visited = bytearray(n + 1)
+    order: List[int] = []
+    for start in sorted(range(1, n + 1), key=degree.__getitem__):
+        if visited[start]:
+            continue
+        visited[start] = 1
+        queue = deque([start])
+        while queue:
+            city = queue.popleft()
+            order.append(city)
+            neighbors = [neighbor for neighbor in targets[offsets[city]:offsets[city + 1]] if not visited[neighbor]]
+            neighbors.sort(key=degree.__getitem__)
+            for neighbor in neighbors:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    queue.append(neighbor)
+    order.reverse()
+    return order
+
+def degree_order(n: int, offsets: array, targets: array) -> List[int]:
+    """Sorts the cities by decreasing degree, so the busiest adjacency lists sit together."""
+    return sorted(range(1, n + 1), key=lambda city: -_degree(offsets, city))
+
+ORDERS: Dict[str, Callable[[int, array, array], List[int]]] = {
+    "bfs": bfs_order,
+    "rcm": rcm_order,
+    "degree": degree_order,
+}
+
+class Renumbering(NamedTuple):
+    """
+    A permutation of the cities 1..n. `to_old[new]` and `to_new[old]` map between
+    the two numberings; index 0 is unused so that city IDs index directly.
+    """
+    to_old: array
+    to_new: array
+
+    @classmethod
+    def from_order(cls, order: List[int]) -> "Renumbering":
+        to_old = array('q', [0])
+        to_old.extend(order)
+        to_new = array('q', bytes(8 * len(to_old)))
+        for new, old in enumerate(to_old):
+            to_new[old] = new
+        return cls(to_old, to_new)
+
+    def relabel_edges(self, city_edges: Iterable[Sequence[int]]) -> Tuple[array, array]:
+        """Rewrites an edge list in the new numbering, as two contiguous arrays."""
+        to_new = self.to_new
+        us = array('q')
+        vs = array('q')
+        for u, v in city_edges:
+            us.append(to_new[u])
+            vs.append(to_new[v])
+        return us, vs
+
+    def to_original(self, cities: Iterable[int]) -> List[int]:
+        """Maps cities in the new numbering, e.g. from a plan, back to their original IDs."""
+        to_old = self.to_old
+        return [to_old[city] for city in cities]
+
+    def save(self, path: str) -> None:
+        """Persists the permutation as raw int64 values of `to_old`."""
+        with open(path, 'wb') as file:
+            self.to_old.tofile(file)
+
+    @classmethod
+    def load(cls, path: str) -> "Renumbering":
+        to_old = array('q')
+        with open(path, 'rb') as file:
+            to_old.frombytes(file.read())
+        return cls.from_order(to_old[1:].tolist())
+
+def compute_renumbering(n: int, city_edges: Iterable[Sequence[int]], method: str = "rcm") -> Renumbering:
+    """
+    Computes a locality-friendly numbering of the cities, so that a traversal of the
+    relabelled graph touches memory in a mostly sequential way.
+
+    Args:
+        n (int): The number of cities.
+        city_edges (Iterable[Sequence[int]]): Pairs of cities connected by a possible road.
+        method (str): One of `bfs`, `rcm` (reverse Cuthill-McKee) or `degree`.
+
+    Returns:
+        Renumbering: The permutation, ready to relabel edges and map results back.
+
+    Example:
+        >>> renumbering = compute_renumbering(4, [[1, 4], [4, 2], [2, 3]], method="bfs")
+        >>> list(renumbering.to_old[1:])
+        [1, 4, 2, 3]
+    """
+    us = array('q')
+    vs = array('q')
+    for u, v in city_edges:
+        us.append(u)
+        vs.append(v)
+    offsets, targets = build_csr(n, us, vs)
+    return Renumbering.from_order(ORDERS[method](n, offsets, targets))
+
+def mean_edge_gap(us: Sequence[int], vs: Sequence[int]) -> float:
+    """The average ID distance between the endpoints of a road, a proxy for memory locality."""
+    if not us:
+        return 0.0
+    return sum(abs(u - v) for u, v in zip(us, vs)) / len(us)
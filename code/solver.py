@@ -0,0 +1,121 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from itertools import islice
+from typing import List, Sequence
+
+class Solver:
+    """
+    A reusable `roads_and_libraries` for hot loops that solve many graphs of similar size.
+
+    The adjacency lists, the visited marks and the traversal stack are kept across
+    solves and only ever grow, so once they are large enough a solve creates no new
+    containers and gives the garbage collector nothing to track. Adjacency lists are
+    never cleared, which would free their storage: each city instead has a fill count,
+    and a solve overwrites its list in place, only appending past the old length and
+    reading no further than the fill count. The stack is likewise a fixed buffer with
+    a separate top index.
+
+    Both per-city marks are epoch stamps rather than booleans: a city's fill count
+    belongs to the current solve only when its stamp equals the solve's epoch, and
+    likewise for visited, so nothing is reset between solves.
+
+    Example:
+        >>> solver = Solver()
+        >>> solver.solve(7, 3, 2, [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7]])
+        16
+        >>> solver.solve(3, 1, 5, [[1, 2]])
+        3
+    """
+
+    __slots__ = ("_adjacency", "_fill", "_stamps", "_marks", "_stack", "_epoch")
+
+    def __init__(self, max_cities: int = 0) -> None:
+        self._adjacency: List[List[int]] = []
+        self._fill: List[int] = []
+        self._stamps: List[int] = []
+        self._marks: List[int] = []
+        self._stack: List[int] = []
+        self._epoch = 0
+        self.reserve(max_cities)
+
+    def reserve(self, max_cities: int) -> None:
+        """Grows the per-city buffers to fit `max_cities`, at least doubling them when they grow."""
+        size = len(self._adjacency)
+        if size >= max_cities + 1:
+            return
+        grow = max(max_cities + 1, 2 * size) - size
+        self._adjacency.extend([] for _ in range(grow))
+        self._fill.extend([0] * grow)
+        self._stamps.extend([0] * grow)
+        self._marks.extend([0] * grow)
+        # Every city is pushed at most once per solve
+        self._stack.extend([0] * grow)
+
+    def solve(self, n: int, c_lib: int, c_road: int, city_edges: Sequence[Sequence[int]]) -> int:
+        """
+        Determines the minimum cost to provide library access to all citizens of HackerLand.
+        Takes the same arguments and returns the same answer as `roads_and_libraries`.
+        """
+        self.reserve(n)
+        adjacency = self._adjacency
+        fill = self._fill
+        stamps = self._stamps
+        marks = self._marks
+        stack = self._stack
+
+        # A fresh epoch invalidates every fill count and visited mark at once
+        self._epoch += 1
+        epoch = self._epoch
+
+        # Entries are overwritten in place, so each list keeps the capacity it grew to
+        for u, v in city_edges:
+            if stamps[u] != epoch:
+                stamps[u] = epoch
+                count = 0
+            else:
+                count = fill[u]
+            try:
+                adjacency[u][count] = v
+            except IndexError:
+                adjacency[u].append(v)
+            fill[u] = count + 1
+
+            if stamps[v] != epoch:
+                stamps[v] = epoch
+                count = 0
+            else:
+                count = fill[v]
+            try:
+                adjacency[v][count] = u
+            except IndexError:
+                adjacency[v].append(u)
+            fill[v] = count + 1
+
+        total_cost = 0
+        for city in range(1, n + 1):
+            if marks[city] == epoch:
+                continue
+            marks[city] = epoch
+            num_cities_in_component = 1
+
+            # Cities without a road this solve still hold a stale fill count; skip them
+            if stamps[city] == epoch:
+                stack[0] = city
+                top = 1
+                while top:
+                    top -= 1
+                    current_city = stack[top]
+                    neighbors = adjacency[current_city]
+                    count = fill[current_city]
+                    # Entries past the fill count are left over from an earlier solve
+                    for neighbor in neighbors if len(neighbors) == count else islice(neighbors, count):
+                        if marks[neighbor] != epoch:
+                            marks[neighbor] = epoch
+                            stack[top] = neighbor
+                            top += 1
+                            num_cities_in_component += 1
+
+            total_cost += min(num_cities_in_component * c_lib, c_lib + (num_cities_in_component - 1) * c_road)
+
+        return total_cost
@@ -0,0 +1,70 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Dict, Iterable, List, Sequence
+from collections import deque
+
+def roads_and_libraries_sparse(n: int, c_lib: int, c_road: int, city_edges: Iterable[Sequence[int]]) -> int:
+    """
+    Determines the minimum cost to provide library access to all citizens of HackerLand,
+    using memory and time proportional to the number of roads rather than to `n`.
+
+    Only the cities that appear in `city_edges` are given compact indices and traversed.
+    Every other city is isolated, so it needs its own library and is accounted for
+    arithmetically as `(n - touched) * c_lib`.
+
+    Args:
+        n (int): The number of cities.
+        c_lib (int): The cost to build a single library.
+        c_road (int): The cost to build a single road.
+        city_edges (Iterable[Sequence[int]]): Pairs of cities connected by a possible road.
+
+    Returns:
+        int: The minimal total cost to ensure all citizens have access to a library.
+
+    Example:
+        >>> roads_and_libraries_sparse(10**9, 3, 2, [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7]])
+        2999999995
+    """
+    # Coordinate-compress the cities touched by a road
+    index: Dict[int, int] = {}
+    graph: List[List[int]] = []
+    for u, v in city_edges:
+        i = index.get(u)
+        if i is None:
+            i = index[u] = len(graph)
+            graph.append([])
+        j = index.get(v)
+        if j is None:
+            j = index[v] = len(graph)
+            graph.append([])
+        graph[i].append(j)
+        graph[j].append(i)
+
+    touched = len(graph)
+    visited = [False] * touched
+    total_cost = (n - touched) * c_lib
+
+    for city in range(touched):
+        if visited[city]:
+            continue
+
+        # Start BFS from this city
+        queue = deque([city])
+        visited[city] = True
+        num_cities_in_component = 1
+
+        while queue:
+            current_city = queue.popleft()
+            for neighbor in graph[current_city]:
+                if not visited[neighbor]:
+                    visited[neighbor] = True
+                    queue.append(neighbor)
+                    num_cities_in_component += 1
+
+        # Calculate the cost for this connected component
+        cost_libs_in_all_cities = num_cities_in_component * c_lib
+        cost_one_lib_with_roads = c_lib + (num_cities_in_component - 1) * c_road
+        total_cost += min(cost_libs_in_all_cities, cost_one_lib_with_roads)
+
+    return total_cost
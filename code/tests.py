@@ -4,9 +4,27 @@
 from typing import List, Tuple, Optional
 from solution import roads_and_libraries as correct_roads_and_libraries
 from user_solution import roads_and_libraries as user_roads_and_libraries
+from canonical_edges import canonicalize_edges
+from sparse_solution import roads_and_libraries_sparse
+from external_solution import roads_and_libraries_external
+from renumbering import ORDERS, Renumbering, compute_renumbering
+from bridges import BridgeIndex
+from fixtures import load_fixtures
+from components import LIBRARIES, ROADS, CityGraph, iter_components
+from persistent_union_find import MAX_LAYERS, BaseNetwork
+from solver import Solver
+from estimator import estimate_cost
+from coverage import place_libraries, roads_and_libraries_within
 
 import unittest
 import random
+import os
+import tempfile
+import math
+import time
+import gc
+import itertools
+import tracemalloc
 
 # Global list to store user-provided test cases
 user_provided_test_cases: List[Tuple[int, int, int, List[List[int]]]] = []
@@ -57,6 +75,46 @@ def generate_random_test_case(
     
     return n, c_lib, c_road, city_edges
 
+def generate_random_roads(rng: random.Random, n: int, max_roads: int) -> List[List[int]]:
+    """
+    Generates up to `max_roads` random roads between cities 1..n. Unlike
+    `generate_random_test_case`, roads may repeat and may be self-loops.
+    """
+    return [[rng.randint(1, n), rng.randint(1, n)] for _ in range(rng.randint(0, max_roads))]
+
+def generate_random_multigraph(
+    rng: random.Random,
+    n_min: int,
+    n_max: int,
+    roads_per_city: int = 2,
+    c_lib_min: int = 1,
+    c_lib_max: int = 10,
+    c_road_min: int = 1,
+    c_road_max: int = 10
+) -> Tuple[int, int, int, List[List[int]]]:
+    """
+    Generates a random test case whose roads come from `generate_random_roads`,
+    from mostly isolated cities up to `roads_per_city * n` roads.
+
+    Args:
+        rng (random.Random): Source of randomness, so each test controls its own seed.
+        n_min (int): Minimum number of cities.
+        n_max (int): Maximum number of cities.
+        roads_per_city (int): Maximum number of roads per city, on average.
+        c_lib_min (int): Minimum cost of building a library.
+        c_lib_max (int): Maximum cost of building a library.
+        c_road_min (int): Minimum cost of building a road.
+        c_road_max (int): Maximum cost of building a road.
+
+    Returns:
+        Tuple[int, int, int, List[List[int]]]: Generated test case parameters.
+    """
+    n = rng.randint(n_min, n_max)
+    city_edges = generate_random_roads(rng, n, roads_per_city * n)
+    c_lib = rng.randint(c_lib_min, c_lib_max)
+    c_road = rng.randint(c_road_min, c_road_max)
+    return n, c_lib, c_road, city_edges
+
 class TestRoadsAndLibraries(unittest.TestCase):
     def test_case_1(self) -> None:
         n = 7
@@ -145,3 +203,451 @@ class TestRoadsAndLibraries(unittest.TestCase):
                     f"Expected={expected}, Got={result}"
             )
 
+class TestCanonicalEdges(unittest.TestCase):
+    def test_drops_self_loops_and_duplicates(self) -> None:
+        city_edges = [[2, 1], [1, 2], [3, 3], [2, 3], [3, 2], [1, 2], [4, 4]]
+        canonical = canonicalize_edges(city_edges)
+
+        self.assertEqual(list(canonical.pairs()), [(1, 2), (2, 3)])
+        self.assertEqual(canonical.self_loops, 2)
+        self.assertEqual(canonical.duplicates, 3)
+        self.assertEqual(canonical.num_edges + canonical.dropped, len(city_edges))
+
+    def test_preserves_the_answer(self) -> None:
+        rng = random.Random(7)
+        for seed in range(1, 11):
+            with self.subTest(seed=seed):
+                n, c_lib, c_road, city_edges = generate_random_test_case(
+                    n_min=2, n_max=100,
+                    c_lib_min=1, c_lib_max=100,
+                    c_road_min=1, c_road_max=100,
+                    seed=seed
+                )
+                # Inflate the feed with reversed duplicates and self-loops
+                noisy_edges = city_edges + [[v, u] for u, v in city_edges] + [[u, u] for u in range(1, n + 1)]
+                rng.shuffle(noisy_edges)
+                canonical = canonicalize_edges(noisy_edges)
+
+                self.assertEqual(canonical.num_edges, len(city_edges))
+                self.assertEqual(canonical.self_loops, n)
+                self.assertEqual(
+                    correct_roads_and_libraries(n, c_lib, c_road, canonical.pairs()),
+                    correct_roads_and_libraries(n, c_lib, c_road, city_edges)
+                )
+
+    def test_pairs_can_be_reused_by_every_engine(self) -> None:
+        city_edges = [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7], [2, 1], [7, 7]]
+        pairs = canonicalize_edges(city_edges).pairs()
+        expected = correct_roads_and_libraries(7, 3, 2, city_edges)
+
+        # BridgeIndex needs len(), and a reused Solver iterates the same pairs twice
+        self.assertEqual(len(pairs), 6)
+        self.assertEqual(pairs[0], (1, 2))
+        self.assertEqual(BridgeIndex(7, 3, 2, pairs).base_cost, expected)
+        solver = Solver()
+        self.assertEqual([solver.solve(7, 3, 2, pairs), solver.solve(7, 3, 2, pairs)], [expected, expected])
+
+class TestSparseSolution(unittest.TestCase):
+    def test_random_cases(self) -> None:
+        for seed in range(1, 11):
+            with self.subTest(seed=seed):
+                n, c_lib, c_road, city_edges = generate_random_test_case(
+                    n_min=2, n_max=100,
+                    c_lib_min=1, c_lib_max=100,
+                    c_road_min=1, c_road_max=100,
+                    seed=seed
+                )
+                # Leave a tail of cities that no road touches
+                n += seed * 10
+                self.assertEqual(
+                    roads_and_libraries_sparse(n, c_lib, c_road, city_edges),
+                    correct_roads_and_libraries(n, c_lib, c_road, city_edges)
+                )
+
+    def test_huge_n_with_few_roads(self) -> None:
+        n = 10**9
+        city_edges = [[1, 2], [2, 3], [3, 1], [4, 1], [n - 1, n], [n, 5]]
+        # Two components of sizes 4 and 3, plus n - 7 isolated cities
+        expected = (3 + 3 * 2) + (3 + 2 * 2) + (n - 7) * 3
+        self.assertEqual(roads_and_libraries_sparse(n, 3, 2, city_edges), expected)
+
+class TestExternalSolution(unittest.TestCase):
+    def test_random_cases_under_memory_cap(self) -> None:
+        for seed in range(1, 11):
+            n, c_lib, c_road, city_edges = generate_random_test_case(
+                n_min=2, n_max=100,
+                c_lib_min=1, c_lib_max=100,
+                c_road_min=1, c_road_max=100,
+                seed=seed
+            )
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                edge_path = os.path.join(tmp_dir, "edges.txt")
+                with open(edge_path, 'w') as file:
+                    file.writelines(f"{u} {v}\n" for u, v in city_edges)
+
+                expected = correct_roads_and_libraries(n, c_lib, c_road, city_edges)
+                # From a table that only ever holds a single edge up to one that holds everything
+                for max_labels in (2, 7, 1000):
+                    with self.subTest(seed=seed, max_labels=max_labels):
+                        result = roads_and_libraries_external(
+                            n, c_lib, c_road, edge_path,
+                            chunk_size=16, max_labels=max_labels, tmp_dir=tmp_dir
+                        )
+                        self.assertEqual(result, expected)
+
+class TestRenumbering(unittest.TestCase):
+    def test_relabelled_graph_has_the_same_answer(self) -> None:
+        for seed in range(1, 11):
+            n, c_lib, c_road, city_edges = generate_random_test_case(
+                n_min=2, n_max=100,
+                c_lib_min=1, c_lib_max=100,
+                c_road_min=1, c_road_max=100,
+                seed=seed
+            )
+            expected = correct_roads_and_libraries(n, c_lib, c_road, city_edges)
+            for method in ORDERS:
+                with self.subTest(seed=seed, method=method):
+                    renumbering = compute_renumbering(n, city_edges, method)
+                    self.assertEqual(sorted(renumbering.to_old[1:]), list(range(1, n + 1)))
+
+                    us, vs = renumbering.relabel_edges(city_edges)
+                    self.assertEqual(correct_roads_and_libraries(n, c_lib, c_road, zip(us, vs)), expected)
+                    self.assertEqual(renumbering.to_original(us), [u for u, _ in city_edges])
+
+    def test_save_and_load_round_trip(self) -> None:
+        renumbering = compute_renumbering(6, [[1, 3], [3, 4], [2, 4], [1, 2], [2, 3], [5, 6]])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "permutation.bin")
+            renumbering.save(path)
+            loaded = Renumbering.load(path)
+        self.assertEqual(loaded, renumbering)
+
+# Largest growth exponent in n + m accepted as "about linear", leaving room for timing noise
+MAX_GROWTH_EXPONENT = 1.35
+# How many times slower than the reference solution a user solution may be
+TIME_BUDGET_FACTOR = 10.0
+
+def paired_best_times(user_func, reference_func, *args, repeats: int = 5) -> Tuple[float, float]:
+    """
+    Best of `repeats` timings of both functions with the garbage collector paused,
+    like timeit. The runs are interleaved so that both see the same machine load.
+    """
+    user_best = reference_best = math.inf
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            user_func(*args)
+            user_best = min(user_best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            reference_func(*args)
+            reference_best = min(reference_best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return user_best, reference_best
+
+def fit_growth_exponent(sizes: List[int], times: List[float]) -> float:
+    """Least-squares slope of log(time) against log(size)."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(t) for t in times]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    variance = sum((x - x_mean) ** 2 for x in xs)
+    return covariance / variance
+
+class TestComplexity(unittest.TestCase):
+    def test_user_solution_scales_linearly(self) -> None:
+        rng = random.Random(2024)
+        sizes, user_times, reference_times = [], [], []
+
+        print(f"\nScaling of user_solution.roads_and_libraries:")
+        print(f"  {'n':>7} {'m':>7} {'user (ms)':>10} {'reference (ms)':>15} {'ratio':>6}")
+        for exponent in range(12, 17):
+            n = 2 ** exponent
+            # Random roads, possibly repeated, about two per city
+            city_edges = [[rng.randint(1, n), rng.randint(1, n)] for _ in range(2 * n)]
+
+            user_time, reference_time = paired_best_times(
+                user_roads_and_libraries, correct_roads_and_libraries, n, 5, 2, city_edges
+            )
+
+            sizes.append(n + len(city_edges))
+            user_times.append(user_time)
+            reference_times.append(reference_time)
+            print(f"  {n:>7} {len(city_edges):>7} {user_time * 1000:>10.2f} {reference_time * 1000:>15.2f} "
+                  f"{user_time / reference_time:>6.2f}")
+
+            # Stop before the next doubling if the solution is already far too slow
+            self.assertLessEqual(
+                user_time, TIME_BUDGET_FACTOR * reference_time,
+                f"User solution took {user_time:.3f}s on n={n}, more than "
+                f"{TIME_BUDGET_FACTOR:g}x the reference solution's {reference_time:.3f}s."
+            )
+
+        # Caches and allocators make even the linear reference look superlinear on
+        # wall-clock time, so growth is measured against the reference instead
+        raw_growth = fit_growth_exponent(sizes, user_times)
+        ratios = [user / reference for user, reference in zip(user_times, reference_times)]
+        growth = 1 + fit_growth_exponent(sizes, ratios)
+        print(f"  Raw growth exponent: {raw_growth:.2f}")
+        print(f"  Growth exponent relative to the linear reference: {growth:.2f} (limit {MAX_GROWTH_EXPONENT})")
+
+        self.assertLessEqual(
+            growth, MAX_GROWTH_EXPONENT,
+            f"User solution grows like (n + m)^{growth:.2f}, expected about linear."
+        )
+
+class TestBridgeIndex(unittest.TestCase):
+    def test_matches_rerunning_without_each_road(self) -> None:
+        for seed in range(1, 11):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                # Sparse roads, with repeats and self-loops, so that plenty of them are bridges
+                n, c_lib, c_road, city_edges = generate_random_multigraph(rng, 2, 30)
+
+                index = BridgeIndex(n, c_lib, c_road, city_edges)
+                expected = [
+                    correct_roads_and_libraries(n, c_lib, c_road, city_edges[:k] + city_edges[k + 1:])
+                    for k in range(len(city_edges))
+                ]
+                self.assertEqual(index.base_cost, correct_roads_and_libraries(n, c_lib, c_road, city_edges))
+                self.assertEqual(index.all_costs(), expected)
+
+    def test_deep_path_does_not_recurse(self) -> None:
+        n = 100000
+        city_edges = [[city, city + 1] for city in range(1, n)]
+        index = BridgeIndex(n, 5, 2, city_edges)
+        # Closing the middle road splits the path into two halves
+        self.assertEqual(index.cost_without(n // 2 - 1), 2 * (5 + (n // 2 - 1) * 2))
+
+class TestGoldenFixtures(unittest.TestCase):
+    def test_large_fixtures(self) -> None:
+        # The answers are precomputed, so only the user solution runs here
+        for name, fixture in load_fixtures().items():
+            with self.subTest(fixture=name):
+                city_edges = fixture.city_edges()
+                result = user_roads_and_libraries(fixture.n, fixture.c_lib, fixture.c_road, city_edges)
+
+                print(f"\nFixture {name}:")
+                print(f"  Parameters: n={fixture.n}, c_lib={fixture.c_lib}, c_road={fixture.c_road}")
+                print(f"Number of City Edges: {fixture.num_edges}")
+                print(f"  Expected Result: {fixture.answer}")
+                print(f"  User Result: {result}")
+
+                self.assertEqual(result, fixture.answer)
+
+class TestComponentIterator(unittest.TestCase):
+    def test_summaries_match_solution(self) -> None:
+        for seed in range(1, 21):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                n, c_lib, c_road, city_edges = generate_random_multigraph(rng, 1, 60)
+
+                components = list(iter_components(n, c_lib, c_road, city_edges))
+                self.assertEqual(sum(c.cost for c in components), correct_roads_and_libraries(n, c_lib, c_road, city_edges))
+
+                # The members partition the cities, and each representative is its component's lowest city
+                seen = []
+                for component in components:
+                    members = component.members()
+                    self.assertEqual(len(members), component.size)
+                    self.assertEqual(min(members), component.representative)
+                    expected_strategy = ROADS if c_road < c_lib and component.size > 1 else LIBRARIES
+                    self.assertEqual(component.strategy, expected_strategy)
+                    seen.extend(members)
+                self.assertEqual(sorted(seen), list(range(1, n + 1)))
+
+    def test_stops_early(self) -> None:
+        n = 100000
+        components = iter_components(n, 5, 2, [[city, city + 1] for city in range(1, n, 2)])
+        first = next(components)
+        self.assertEqual((first.representative, first.size, first.strategy, first.cost), (1, 2, ROADS, 7))
+        self.assertEqual(first.members(), [1, 2])
+
+class TestPersistentUnionFind(unittest.TestCase):
+    def test_scenarios_match_solution_and_stay_isolated(self) -> None:
+        for seed in range(1, 11):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                n, c_lib, c_road, base_edges = generate_random_multigraph(rng, 1, 80, roads_per_city=1)
+                base = BaseNetwork(n, c_lib, c_road, base_edges)
+                self.assertEqual(base.cost, correct_roads_and_libraries(n, c_lib, c_road, base_edges))
+
+                # Build a tree of scenarios, forking from the base and from other scenarios
+                scenarios = [(base.fork(), list(base_edges))]
+                for _ in range(8):
+                    parent, parent_edges = rng.choice(scenarios)
+                    child = parent.fork()
+                    extra = generate_random_roads(rng, n, 10)
+                    child.add_edges(extra)
+                    scenarios.append((child, parent_edges + extra))
+
+                for scenario, edges in scenarios:
+                    self.assertEqual(scenario.cost, correct_roads_and_libraries(n, c_lib, c_road, edges))
+                self.assertEqual(base.cost, correct_roads_and_libraries(n, c_lib, c_road, base_edges))
+
+    def test_delta_is_proportional_to_added_roads(self) -> None:
+        n = 100000
+        base = BaseNetwork(n, 5, 2, [[city, city + 1] for city in range(1, n, 2)])
+        scenario = base.fork()
+        scenario.add_edges([[city, city + 2] for city in range(1, 200, 2)])
+        self.assertLessEqual(scenario.delta_size(), 4 * 100)
+        self.assertEqual(scenario.component_size(1), 202)
+        self.assertFalse(base.fork().connected(1, 3))
+
+        # Roads added to a scenario after it was forked do not leak into the fork
+        child = scenario.fork()
+        scenario.add_edge(1, 1001)
+        self.assertTrue(scenario.connected(1, 1001))
+        self.assertFalse(child.connected(1, 1001))
+        self.assertEqual(child.component_size(1), 202)
+
+    def test_queries_do_not_grow_a_fork(self) -> None:
+        n = 10000
+        base = BaseNetwork(n, 5, 2, [])
+        parent = base.fork()
+        parent.add_edges([[city, city + 1] for city in range(1, 3001)])
+        fork = parent.fork()
+        before = fork.delta_size()
+        for city in range(1, 3001):
+            self.assertTrue(fork.connected(1, city))
+            fork.component_size(city)
+        self.assertEqual(fork.delta_size(), before)
+
+    def test_long_fork_chains_are_merged(self) -> None:
+        n = 200
+        base = BaseNetwork(n, 5, 2, [])
+        scenario = base.fork()
+        edges = []
+        for city in range(1, 100):
+            scenario.add_edge(city, city + 1)
+            edges.append([city, city + 1])
+            scenario = scenario.fork()
+            self.assertLessEqual(scenario._below.depth, MAX_LAYERS)
+        self.assertEqual(scenario.cost, correct_roads_and_libraries(n, 5, 2, edges))
+
+class TestSolver(unittest.TestCase):
+    def test_reused_solver_matches_solution(self) -> None:
+        # One solver across graphs that grow and shrink, so stale buffers would show up
+        solver = Solver()
+        rng = random.Random(7)
+        for case in range(50):
+            with self.subTest(case=case):
+                size = rng.choice([1, 5, 50, 500])
+                n, c_lib, c_road, city_edges = generate_random_multigraph(rng, size, size)
+                self.assertEqual(solver.solve(n, c_lib, c_road, city_edges),
+                                 correct_roads_and_libraries(n, c_lib, c_road, city_edges))
+
+    def test_steady_state_solves_do_not_allocate(self) -> None:
+        rng = random.Random(7)
+        n = 1000
+        city_edges = generate_random_roads(rng, n, 4 * n)
+        solver = Solver()
+        solver.solve(n, 3, 2, city_edges)
+
+        # Repeating the graph, or solving a subgraph of it, fits in the grown buffers
+        for edges in (city_edges, city_edges[::2]):
+            tracemalloc.start()
+            try:
+                solver.solve(n, 3, 2, edges)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            self.assertLess(peak, 2048)
+
+    def test_roads_from_previous_solve_are_forgotten(self) -> None:
+        solver = Solver()
+        self.assertEqual(solver.solve(4, 5, 1, [[1, 2], [2, 3], [3, 4]]), 8)
+        self.assertEqual(solver.solve(4, 5, 1, []), 20)
+        self.assertEqual(solver.solve(4, 5, 1, [[3, 4]]), 16)
+
+class TestEstimator(unittest.TestCase):
+    def test_bounds_contain_exact_answer(self) -> None:
+        for seed in range(1, 11):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                # From mostly isolated cities to one giant component
+                n, c_lib, c_road, city_edges = generate_random_multigraph(rng, 1000, 5000, c_lib_min=2, c_road_max=1)
+
+                estimate = estimate_cost(CityGraph(n, city_edges), c_lib, c_road, samples=5000, seed=seed + 100)
+                exact = correct_roads_and_libraries(n, c_lib, c_road, city_edges)
+                self.assertLessEqual(estimate.lower, exact)
+                self.assertGreaterEqual(estimate.upper, exact)
+                self.assertLessEqual(estimate.lower, estimate.estimate)
+                self.assertLessEqual(estimate.estimate, estimate.upper)
+
+    def test_expensive_roads_are_exact(self) -> None:
+        graph = CityGraph(7, [[1, 2], [2, 3], [3, 1], [4, 1], [5, 6], [6, 7]])
+        estimate = estimate_cost(graph, 2, 3, samples=10, seed=1)
+        self.assertEqual((estimate.lower, estimate.estimate, estimate.upper), (14, 14, 14))
+
+    def test_time_budget(self) -> None:
+        n = 100000
+        graph = CityGraph(n, [[city, city + 1] for city in range(1, n)])
+        estimate = estimate_cost(graph, 5, 2, samples=None, time_budget=0.05, seed=1)
+        self.assertGreater(estimate.samples, 0)
+        self.assertLessEqual(estimate.lower, correct_roads_and_libraries(n, 5, 2, [[city, city + 1] for city in range(1, n)]))
+
+class TestCoverage(unittest.TestCase):
+    @staticmethod
+    def distances_to_libraries(n: int, city_edges: List[List[int]], libraries: List[int]) -> List[float]:
+        graph = {city: [] for city in range(1, n + 1)}
+        for u, v in city_edges:
+            graph[u].append(v)
+            graph[v].append(u)
+        distance = [math.inf] * (n + 1)
+        frontier = list(libraries)
+        for library in libraries:
+            distance[library] = 0
+        while frontier:
+            next_frontier = []
+            for city in frontier:
+                for neighbor in graph[city]:
+                    if distance[neighbor] == math.inf:
+                        distance[neighbor] = distance[city] + 1
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return distance[1:]
+
+    def test_unbounded_k_matches_solution(self) -> None:
+        for seed in range(1, 21):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                n, c_lib, c_road, city_edges = generate_random_multigraph(rng, 1, 200)
+                self.assertEqual(roads_and_libraries_within(n, c_lib, c_road, city_edges, k=None),
+                                 correct_roads_and_libraries(n, c_lib, c_road, city_edges))
+
+    def test_exact_mode_is_optimal(self) -> None:
+        for seed in range(1, 31):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                n, _, _, city_edges = generate_random_multigraph(rng, 1, 9)
+                k = rng.randint(0, 3)
+
+                # Brute force: the fewest libraries covering everyone within k roads, over the whole graph
+                fewest = min(
+                    count for count in range(1, n + 1)
+                    for chosen in itertools.combinations(range(1, n + 1), count)
+                    if max(self.distances_to_libraries(n, city_edges, list(chosen))) <= k
+                )
+                self.assertEqual(len(place_libraries(n, city_edges, k)), fewest)
+
+    def test_greedy_placement_covers_every_city(self) -> None:
+        for seed in range(1, 11):
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                n, _, _, city_edges = generate_random_multigraph(rng, 50, 500)
+                k = rng.randint(0, 4)
+                libraries = place_libraries(n, city_edges, k, exact_limit=0)
+                self.assertLessEqual(max(self.distances_to_libraries(n, city_edges, libraries)), k)
+                self.assertEqual(len(set(libraries)), len(libraries))
+
+    def test_path_is_covered_optimally(self) -> None:
+        # On a tree the greedy placement is optimal: one library per 2k + 1 cities of a path
+        n = 100000
+        city_edges = [[city, city + 1] for city in range(1, n)]
+        for k in (1, 2, 5):
+            with self.subTest(k=k):
+                self.assertEqual(len(place_libraries(n, city_edges, k)), math.ceil(n / (2 * k + 1)))
@@ -0,0 +1,221 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+# Opening criterion: a cell is approximated by its center of mass when its width
+# is less than THETA times its distance to the node
+DEFAULT_THETA = 0.5
+
+# Deepest quadtree level; 2 bits per level must fit in an int64 Morton code
+MAX_DEPTH = 20
+
+# Same minimum distances and convergence threshold as networkx's spring_layout
+MIN_DISTANCE = 0.01
+THRESHOLD = 1e-4
+
+class QuadtreeLevel(NamedTuple):
+    """The non-empty cells of one quadtree level, sorted by Morton code."""
+    codes: np.ndarray
+    mass: np.ndarray
+    center: np.ndarray
+
+def morton_codes(points: np.ndarray, depth: int) -> Tuple[np.ndarray, float]:
+    """
+    Interleaves the bits of every point's cell on a 2^depth x 2^depth grid laid over
+    the points' bounding square, so that the code of a point's cell at level l is
+    `code >> 2 * (depth - l)`.
+
+    Returns:
+        Tuple[np.ndarray, float]: The (n,) codes and the width of the bounding square.
+    """
+    low = points.min(axis=0)
+    width = float((points.max(axis=0) - low).max()) or 1.0
+    # Pad slightly so the largest coordinate still falls inside the last cell
+    width *= 1 + 1e-9
+    grid = ((points - low) / width * (1 << depth)).astype(np.int64)
+    np.clip(grid, 0, (1 << depth) - 1, out=grid)
+
+    codes = np.zeros(len(points), dtype=np.int64)
+    for bit in range(depth):
+        codes |= ((grid[:, 0] >> bit) & 1) << (2 * bit)
+        codes |= ((grid[:, 1] >> bit) & 1) << (2 * bit + 1)
+    return codes, width
+
+def build_quadtree(points: np.ndarray, codes: np.ndarray, depth: int) -> List[QuadtreeLevel]:
+    """Aggregates the mass and center of mass of every non-empty cell, level by level."""
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    sorted_points = points[order]
+
+    levels = []
+    for level in range(depth + 1):
+        cell_codes = sorted_codes >> (2 * (depth - level))
+        # Sorting by the leaf code also sorts every coarser level, so cells are contiguous runs
+        starts = np.flatnonzero(np.r_[True, cell_codes[1:] != cell_codes[:-1]])
+        mass = np.diff(np.r_[starts, len(cell_codes)]).astype(float)
+        center = np.add.reduceat(sorted_points, starts, axis=0) / mass[:, np.newaxis]
+        levels.append(QuadtreeLevel(cell_codes[starts], mass, center))
+    return levels
+
+def repulsive_displacement(
+    pos: np.ndarray,
+    k: float,
+    theta: float = DEFAULT_THETA,
+    depth: Optional[int] = None
+) -> np.ndarray:
+    """
+    Approximates the Fruchterman-Reingold repulsion `sum_j delta_ij * k^2 / d_ij^2`
+    on every node with a Barnes-Hut quadtree, in O(n log n).
+
+    The tree is walked breadth-first for all nodes at once: a frontier holds
+    (node, cell) pairs, accepted pairs add their force in bulk and the rest are
+    replaced by the cell's non-empty children on the next level.
+    """
+    n = len(pos)
+    if depth is None:
+        depth = int(np.clip(np.ceil(np.log2(max(n, 2)) / 2) + 1, 1, MAX_DEPTH))
+    codes, width = morton_codes(pos, depth)
+    levels = build_quadtree(pos, codes, depth)
+
+    displacement = np.zeros_like(pos)
+    nodes = np.arange(n)
+    cells = np.zeros(n, dtype=np.int64)
+    for level_index, level in enumerate(levels):
+        cell_codes = level.codes[cells]
+        own = (codes[nodes] >> (2 * (depth - level_index))) == cell_codes
+        mass = level.mass[cells]
+        center = level.center[cells]
+        node_pos = pos[nodes]
+
+        if level_index == depth:
+            # Leaves are never opened; a node's own leaf counts without the node itself
+            shared = own & (mass > 1)
+            shared_mass = mass[shared]
+            center[shared] = (center[shared] * shared_mass[:, np.newaxis] - node_pos[shared]) / (shared_mass - 1)[:, np.newaxis]
+            mass[shared] -= 1
+
+        delta = node_pos - center
+        distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), MIN_DISTANCE)
+        if level_index == depth:
+            accept = ~own | shared
+        else:
+            accept = ~own & (width / (1 << level_index) < theta * distance)
+
+        accepted = nodes[accept]
+        strength = mass[accept] * k * k / distance[accept] ** 2
+        displacement[:, 0] += np.bincount(accepted, weights=delta[accept, 0] * strength, minlength=n)
+        displacement[:, 1] += np.bincount(accepted, weights=delta[accept, 1] * strength, minlength=n)
+
+        if level_index == depth:
+            break
+
+        # Open the remaining cells into their non-empty children
+        opened = ~accept
+        child_codes = (cell_codes[opened][:, np.newaxis] << 2) | np.arange(4)
+        next_codes = levels[level_index + 1].codes
+        child_cells = np.searchsorted(next_codes, child_codes)
+        exists = next_codes[np.minimum(child_cells, len(next_codes) - 1)] == child_codes
+        nodes = np.broadcast_to(nodes[opened][:, np.newaxis], child_codes.shape)[exists]
+        cells = child_cells[exists]
+
+    return displacement
+
+def attractive_displacement(pos: np.ndarray, us: np.ndarray, vs: np.ndarray, k: float) -> np.ndarray:
+    """The spring force `-delta_ij * d_ij / k` along every road, summed per node."""
+    n = len(pos)
+    delta = pos[us] - pos[vs]
+    distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), MIN_DISTANCE)
+    force = delta * (distance / k)[:, np.newaxis]
+
+    displacement = np.zeros_like(pos)
+    for axis in range(2):
+        displacement[:, axis] -= np.bincount(us, weights=force[:, axis], minlength=n)
+        displacement[:, axis] += np.bincount(vs, weights=force[:, axis], minlength=n)
+    return displacement
+
+def barnes_hut_positions(
+    n: int,
+    us: np.ndarray,
+    vs: np.ndarray,
+    k: Optional[float] = None,
+    iterations: int = 50,
+    seed: Optional[int] = None,
+    scale: float = 1,
+    theta: float = DEFAULT_THETA
+) -> np.ndarray:
+    """
+    Runs the Fruchterman-Reingold layout of `nx.spring_layout` on nodes 0..n-1, with
+    the O(n^2) repulsion replaced by a Barnes-Hut approximation and the attraction
+    computed over the edge arrays only.
+
+    Args:
+        n (int): The number of nodes.
+        us (np.ndarray): First endpoint of every edge.
+        vs (np.ndarray): Second endpoint of every edge.
+        k (Optional[float]): Optimal distance between nodes; defaults to `sqrt(1 / n)`.
+        iterations (int): Maximum number of cooling steps.
+        seed (Optional[int]): Seed for the random initial positions, as in networkx.
+        scale (float): Half-width of the square the positions are rescaled to.
+        theta (float): Barnes-Hut opening criterion; smaller is more accurate and slower.
+
+    Returns:
+        np.ndarray: The (n, 2) positions, centered on the origin.
+    """
+    if n == 0:
+        return np.zeros((0, 2))
+    if n == 1:
+        return np.zeros((1, 2))
+
+    # Same initial positions as networkx for the same seed
+    pos = np.random.RandomState(seed).rand(n, 2)
+    if k is None:
+        k = np.sqrt(1.0 / n)
+
+    # Each road pulls once, however often it is listed; self-loops exert no force
+    pairs = np.unique(np.sort(np.stack([us, vs], axis=1).astype(np.int64), axis=1), axis=0)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    us, vs = pairs[:, 0], pairs[:, 1]
+
+    # Simple linear cooling, starting at a tenth of the initial extent
+    t = (pos.max(axis=0) - pos.min(axis=0)).max() * 0.1
+    dt = t / (iterations + 1)
+    for _ in range(iterations):
+        displacement = repulsive_displacement(pos, k, theta) + attractive_displacement(pos, us, vs, k)
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), MIN_DISTANCE)
+        delta_pos = displacement * (t / length)[:, np.newaxis]
+        pos += delta_pos
+        t -= dt
+        if np.linalg.norm(delta_pos) / n < THRESHOLD:
+            break
+
+    pos -= pos.mean(axis=0)
+    limit = np.abs(pos).max()
+    if limit > 0:
+        pos *= scale / limit
+    return pos
+
+def barnes_hut_layout(
+    nodes: Sequence[str],
+    edges: Sequence[Tuple[str, str]],
+    k: Optional[float] = None,
+    iterations: int = 50,
+    seed: Optional[int] = None,
+    scale: float = 1,
+    theta: float = DEFAULT_THETA
+) -> Dict[str, np.ndarray]:
+    """
+    Drop-in replacement for `nx.spring_layout(G, scale=..., seed=..., k=..., iterations=...)`
+    on graphs far too large for its O(n^2) iterations.
+
+    Example:
+        >>> pos = barnes_hut_layout(["1", "2", "3"], [("1", "2"), ("2", "3")], seed=42, scale=4)
+        >>> sorted(pos), float(np.abs(np.array(list(pos.values()))).max())
+        (['1', '2', '3'], 4.0)
+    """
+    index = {node: i for i, node in enumerate(nodes)}
+    us = np.array([index[u] for u, _ in edges], dtype=np.int64)
+    vs = np.array([index[v] for _, v in edges], dtype=np.int64)
+    pos = barnes_hut_positions(len(index), us, vs, k=k, iterations=iterations, seed=seed, scale=scale, theta=theta)
+    return {node: pos[i] for node, i in index.items()}
@@ -0,0 +1,188 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Maps a layout name onto the script that knows how to draw it
+LAYOUT_MODULES: Dict[str, str] = {
+    "networkx": "networkx_visualization",
+    "circular": "dynamic_graph_visualization",
+}
+
+GRAPH_FILE_EXTENSION = ".txt"
+
+class RenderJob(NamedTuple):
+    input_path: str
+    output_path: str
+    layout: str = "networkx"
+    batch_edges: bool = False
+    layout_engine: str = "spring"
+
+def read_graph_file(path: str) -> Tuple[int, int, int, List[Tuple[str, str]]]:
+    """
+    Reads a graph in the same format the visualization scripts prompt for:
+    a first line `n m c_lib c_road` followed by `m` lines of `u v`.
+
+    Returns:
+        Tuple[int, int, int, List[Tuple[str, str]]]: n, c_lib, c_road and the edges.
+    """
+    with open(path, 'r') as file:
+        tokens = file.read().split()
+
+    n, m, c_lib, c_road = map(int, tokens[:4])
+    labels = tokens[4:4 + 2 * m]
+    if len(labels) != 2 * m:
+        raise ValueError(f"{path}: expected {m} roads, found {len(labels) // 2}.")
+
+    edges = list(zip(labels[0::2], labels[1::2]))
+    return n, c_lib, c_road, edges
+
+def road_graph(n: int, edges: List[Tuple[str, str]]) -> "nx.Graph":
+    """
+    Builds the NetworkX graph of the cities, which merges duplicate and reversed
+    roads into a single edge. Its edges are the roads every renderer draws.
+    """
+    # Only imported by the renderers that need it, not by the batch driver
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(str(i) for i in range(1, n + 1))
+    G.add_edges_from(edges)
+    return G
+
+def jobs_from_directory(
+    input_dir: str,
+    output_dir: str,
+    layout: str,
+    batch_edges: bool = False,
+    layout_engine: str = "spring"
+) -> List[RenderJob]:
+    """
+    Creates one job per graph file in `input_dir`; `foo.txt` renders to `foo.png`.
+    """
+    jobs = []
+    for name in sorted(os.listdir(input_dir)):
+        stem, extension = os.path.splitext(name)
+        if extension != GRAPH_FILE_EXTENSION:
+            continue
+        jobs.append(RenderJob(
+            input_path=os.path.join(input_dir, name),
+            output_path=os.path.join(output_dir, stem + ".png"),
+            layout=layout,
+            batch_edges=batch_edges,
+            layout_engine=layout_engine
+        ))
+    return jobs
+
+def jobs_from_manifest(
+    manifest_path: str,
+    output_dir: str,
+    layout: str,
+    batch_edges: bool = False,
+    layout_engine: str = "spring"
+) -> List[RenderJob]:
+    """
+    Creates jobs from a JSON manifest: a list of objects with an `input` graph
+    file, and optionally an `output` filename, a `layout`, `batch_edges` and a
+    `layout_engine`. Relative inputs are resolved against the manifest's own directory.
+    """
+    with open(manifest_path, 'r') as file:
+        entries = json.load(file)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for entry in entries:
+        input_path = os.path.join(base_dir, entry["input"])
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        jobs.append(RenderJob(
+            input_path=input_path,
+            output_path=os.path.join(output_dir, entry.get("output", stem + ".png")),
+            layout=entry.get("layout", layout),
+            batch_edges=entry.get("batch_edges", batch_edges),
+            layout_engine=entry.get("layout_engine", layout_engine)
+        ))
+    return jobs
+
+def render_job(job: RenderJob) -> Tuple[RenderJob, bool]:
+    """
+    Renders one job. Runs inside a worker process, so Manim is only imported
+    there, and every job gets its own scratch media directory.
+    """
+    module = importlib.import_module(LAYOUT_MODULES[job.layout])
+    n, c_lib, c_road, edges = read_graph_file(job.input_path)
+
+    media_dir = tempfile.mkdtemp(prefix="render-")
+    try:
+        # Only the networkx layout is force-directed
+        engine = {"layout_engine": job.layout_engine} if job.layout == "networkx" else {}
+        created = module.render_graph(
+            n, c_lib, c_road, edges, job.output_path, media_dir=media_dir, batch_edges=job.batch_edges, **engine
+        )
+    finally:
+        shutil.rmtree(media_dir, ignore_errors=True)
+
+    return job, created
+
+def render_all(jobs: List[RenderJob], workers: Optional[int] = None) -> List[Tuple[RenderJob, bool]]:
+    """
+    Renders every job in parallel worker processes, one per core by default.
+
+    Returns:
+        List[Tuple[RenderJob, bool]]: Each job with whether its image was produced,
+        in the same order as `jobs`.
+    """
+    for job in jobs:
+        if job.layout not in LAYOUT_MODULES:
+            raise ValueError(f"Unknown layout '{job.layout}' for {job.input_path}.")
+
+    results: Dict[RenderJob, bool] = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(render_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                _, created = future.result()
+            except Exception as error:
+                # One bad graph must not take down the rest of the batch
+                print(f"{os.path.basename(job.input_path)}: {type(error).__name__}: {error}")
+                created = False
+            results[job] = created
+            status = "saved as" if created else "failed, no output for"
+            print(f"{os.path.basename(job.input_path)}: {status} {job.output_path}")
+
+    return [(job, results[job]) for job in jobs]
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many graph visualizations in parallel.")
+    parser.add_argument("source", type=str, help="A directory of graph .txt files or a JSON manifest.")
+    parser.add_argument("--output-dir", type=str, default=os.path.join(os.path.dirname(os.getcwd()), "assets"),
+                        help="Directory the images are written to (default: ../assets).")
+    parser.add_argument("--layout", type=str, choices=sorted(LAYOUT_MODULES), default="networkx",
+                        help="Layout used for graphs that do not specify one.")
+    parser.add_argument("--batch-edges", action="store_true",
+                        help="Draw every road as a single mobject, for graphs that do not specify it.")
+    parser.add_argument("--layout-engine", type=str, choices=["spring", "barnes-hut"], default="spring",
+                        help="Force-directed engine of the networkx layout, for graphs that do not specify one.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores).")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        jobs = jobs_from_directory(args.source, args.output_dir, args.layout, args.batch_edges, args.layout_engine)
+    else:
+        jobs = jobs_from_manifest(args.source, args.output_dir, args.layout, args.batch_edges, args.layout_engine)
+
+    results = render_all(jobs, workers=args.workers)
+    failed = [job for job, created in results if not created]
+    print(f"Rendered {len(results) - len(failed)} of {len(results)} graphs.")
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from batch_render import LAYOUT_MODULES, RenderJob, render_job
+
+GENERATOR_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(GENERATOR_DIR)
+ASSETS_DIR = os.path.join(ROOT_DIR, "assets")
+
+FIGURES_PATH = os.path.join(GENERATOR_DIR, "figures.json")
+STATE_PATH = os.path.join(GENERATOR_DIR, ".build_state.json")
+
+TEX_INPUT = os.path.join(ROOT_DIR, "main.tex")
+TEX_OUTPUT = os.path.join(ROOT_DIR, "fixed.tex")
+TEX_FIXER = os.path.join(ROOT_DIR, "code", "dollar_sign_fixer.py")
+
+# Modules every figure is drawn with, so touching them invalidates all figures
+SHARED_SOURCES = ["edge_geometry.py", "manim_roads.py"]
+
+def file_digest(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def figure_sources(figure: Dict[str, Any]) -> List[str]:
+    """Lists every file a figure's image depends on."""
+    if "script" in figure:
+        sources = [figure["script"]]
+    else:
+        layout = figure.get("layout", "networkx")
+        sources = [figure["input"], LAYOUT_MODULES[layout] + ".py", "batch_render.py"]
+        if layout == "networkx":
+            sources.append("barnes_hut_layout.py")
+    return [os.path.join(GENERATOR_DIR, source) for source in sources + SHARED_SOURCES]
+
+def figure_digest(figure: Dict[str, Any]) -> str:
+    """
+    Hashes a figure's parameters together with the contents of everything it is
+    drawn from, so any change to the graph, the script or its settings shows up.
+    """
+    digest = hashlib.sha256(json.dumps(figure, sort_keys=True).encode())
+    for path in figure_sources(figure):
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+def render_script_figure(figure: Dict[str, Any], output_path: str) -> bool:
+    """
+    Renders a scene whose graph is written into the script itself, through the
+    Manim command line and a scratch media directory.
+    """
+    media_dir = tempfile.mkdtemp(prefix="build-")
+    try:
+        subprocess.run(
+            ["manim", "-qls", "--media_dir", media_dir, figure["script"], figure["scene"]],
+            cwd=GENERATOR_DIR, check=True, stdout=subprocess.DEVNULL
+        )
+        images = glob.glob(os.path.join(media_dir, "images", "**", "*.png"), recursive=True)
+        if not images:
+            return False
+        shutil.move(images[0], output_path)
+        return True
+    finally:
+        shutil.rmtree(media_dir, ignore_errors=True)
+
+def build_figure(figure: Dict[str, Any]) -> Tuple[str, bool]:
+    output_path = os.path.join(ASSETS_DIR, figure["output"])
+    try:
+        if "script" in figure:
+            return figure["output"], render_script_figure(figure, output_path)
+
+        job = RenderJob(
+            input_path=os.path.join(GENERATOR_DIR, figure["input"]),
+            output_path=output_path,
+            layout=figure.get("layout", "networkx"),
+            batch_edges=figure.get("batch_edges", False),
+            layout_engine=figure.get("layout_engine", "spring")
+        )
+        _, created = render_job(job)
+        return figure["output"], created
+    except Exception as error:
+        # A broken figure, e.g. a malformed graph file, must not take down the others
+        print(f"{figure['output']}: {type(error).__name__}: {error}")
+        return figure["output"], False
+
+def load_state() -> Dict[str, Dict[str, str]]:
+    """
+    Reads the recorded digests: `figures` maps an output name to its figure's digest
+    and `tex` maps a TeX source to its own, so the two can never collide.
+    """
+    if not os.path.exists(STATE_PATH):
+        return {"figures": {}, "tex": {}}
+    with open(STATE_PATH, 'r') as file:
+        state = json.load(file)
+    if "figures" not in state:
+        # State written before the two namespaces were split
+        tex = {"main.tex": state.pop("main.tex")} if "main.tex" in state else {}
+        return {"figures": state, "tex": tex}
+    return state
+
+def save_state(state: Dict[str, Dict[str, str]]) -> None:
+    # Written to a temporary file first, so an interrupted build never leaves a truncated state
+    partial = f"{STATE_PATH}.tmp"
+    with open(partial, 'w') as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(partial, STATE_PATH)
+
+def build(force: bool = False, workers: Optional[int] = None) -> bool:
+    """
+    Rebuilds the stale figures in `assets/` in parallel and reruns the TeX math
+    conversion if `main.tex` changed. A figure is stale when its digest differs
+    from the one recorded at its last successful build, or its image is missing.
+
+    Returns:
+        bool: Whether every stale target was rebuilt successfully.
+    """
+    with open(FIGURES_PATH, 'r') as file:
+        figures = json.load(file)
+
+    state = load_state()
+    built = state["figures"]
+    succeeded = True
+
+    digests = {}
+    for figure in figures:
+        try:
+            digests[figure["output"]] = figure_digest(figure)
+        except (KeyError, OSError) as error:
+            # An unknown layout or a missing source only fails this figure
+            print(f"{figure['output']}: failed ({type(error).__name__}: {error})")
+            succeeded = False
+
+    stale = [
+        figure for figure in figures
+        if figure["output"] in digests and (
+            force
+            or built.get(figure["output"]) != digests[figure["output"]]
+            or not os.path.exists(os.path.join(ASSETS_DIR, figure["output"]))
+        )
+    ]
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers or min(len(stale), os.cpu_count() or 1)) as executor:
+            futures = {executor.submit(build_figure, figure): figure["output"] for figure in stale}
+            for future in as_completed(futures):
+                output = futures[future]
+                try:
+                    _, created = future.result()
+                except Exception as error:
+                    # Only reached if the worker process itself died
+                    print(f"{output}: {type(error).__name__}: {error}")
+                    created = False
+                print(f"{output}: {'rebuilt' if created else 'failed'}")
+                if created:
+                    built[output] = digests[output]
+                    # Record each success right away, so a later failure cannot lose it
+                    save_state(state)
+                succeeded = succeeded and created
+
+    tex_digest = file_digest(TEX_INPUT)
+    tex_stale = force or state["tex"].get("main.tex") != tex_digest or not os.path.exists(TEX_OUTPUT)
+    if tex_stale:
+        result = subprocess.run([sys.executable, TEX_FIXER], cwd=ROOT_DIR)
+        if result.returncode == 0:
+            state["tex"]["main.tex"] = tex_digest
+        succeeded = succeeded and result.returncode == 0
+
+    if not stale and not tex_stale:
+        if succeeded:
+            print("Everything is up to date.")
+        return succeeded
+
+    save_state(state)
+    return succeeded
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the stale figures used by main.tex.")
+    parser.add_argument("--force", action="store_true", help="Rebuild everything, even if nothing changed.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores).")
+    args = parser.parse_args()
+
+    if not build(force=args.force, workers=args.workers):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
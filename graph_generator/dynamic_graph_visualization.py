@@ -4,6 +4,8 @@
 import argparse
 from typing import Any, Dict, List, Tuple
 from manim import *
+from edge_geometry import edge_curves
+from manim_roads import Edge, Roads
 import numpy as np
 import os
 
@@ -21,72 +23,18 @@ class Node(VGroup):
     def get_center(self) -> np.ndarray:
         return self.circle.get_center()
 
-class Edge(VMobject):
-    def __init__(self, u: Node, v: Node, curvature: float = 0.2, radius: float = 0.3, **kwargs: Any) -> None:
-        super().__init__(**kwargs)
-        self.u = u
-        self.v = v
-        self.curvature = curvature
-        self.radius = radius
-        self.create_edge()
-        
-    def create_edge(self) -> None:
-        unit_direction: np.ndarray = self.get_unit_direction()
-        
-        P0: np.ndarray = self.u.get_center() + unit_direction * self.radius
-        P3: np.ndarray = self.v.get_center() - unit_direction * self.radius
-        
-        distance: float = np.linalg.norm(P3 - P0)
-        P1, P2 = self.compute_control_points(P0, P3, self.curvature, distance)
-        bezier_curve = CubicBezier(P0, P1, P2, P3)
-        
-        self.dashed_curve = DashedVMobject(bezier_curve)
-        self.add(self.dashed_curve)  
-    
-    def get_unit_direction(self) -> np.ndarray:
-        direction = self.v.get_center() - self.u.get_center()
-        return direction / np.linalg.norm(direction)
-    
-    @staticmethod
-    def get_perpendicular_vector(vector) -> np.ndarray:
-        """Returns a perpendicular vector to the input vector."""
-        return np.array([-vector[1], vector[0], 0])
-    
-    def compute_control_points(
-        self,
-        P0: np.ndarray,
-        P3: np.ndarray,
-        curvature: float,
-        distance: float) -> Tuple[np.ndarray, np.ndarray]:
-        """
-        Compute the two control points (P1 and P2) for a cubic Bezier curve
-        to ensure symmetric curvature.
-        """
-        # Direction from P0 to P3
-        direction: np.ndarray = P3 - P0
-        unit_direction: np.ndarray = direction / np.linalg.norm(direction)
-        
-        # Perpendicular direction for curvature
-        perp_direction: np.ndarray = self.get_perpendicular_vector(unit_direction)
-        
-        # Calculate P1 and P2 at t=0.25 and t=0.75 along the line
-        t1: float = 0.25
-        t2: float = 0.75
-        
-        P1: np.ndarray = P0 + (direction * t1) + (perp_direction * curvature * distance)
-        P2: np.ndarray = P0 + (direction * t2) - (perp_direction * curvature * distance)
-        
-        return P1, P2
-     
 class Graph(VGroup):
     def __init__(
         self,
         nodes_data: Dict[str, np.ndarray],
         edges_data: List[Tuple[str, str]],
+        batch_edges: bool = False,
         **kwargs) -> None:
         super().__init__(**kwargs)
         self.nodes = {}
         self.edges = []
+        self.roads = None
+        self.batch_edges = batch_edges
         self.create_nodes(nodes_data)
         self.create_edges(edges_data)
         
@@ -97,15 +45,28 @@ class Graph(VGroup):
             self.add(node)
     
     def create_edges(self, edges_data: List[Tuple[str, str]]) -> None:
-        for u_label, v_label in edges_data:
+        if not edges_data:
+            return
+
+        # Compute every edge's curve in a single vectorized pass
+        u_centers = np.array([self.nodes[u_label].get_center() for u_label, _ in edges_data])
+        v_centers = np.array([self.nodes[v_label].get_center() for _, v_label in edges_data])
+        curves = edge_curves(u_centers, v_centers, radius=0.3, curvature=0.3)
+
+        if self.batch_edges:
+            self.roads = Roads(curves)
+            self.add(self.roads)
+            return
+
+        for (u_label, v_label), points in zip(edges_data, curves):
             u: Node = self.nodes[u_label]
             v: Node = self.nodes[v_label]
-            edge = Edge(u, v, curvature=0.3)
+            edge = Edge(u, v, curvature=0.3, points=points)
             self.edges.append(edge)
             self.add(edge)
         
 class CurvyDashedGraph(Scene):
-    def __init__(self, node_positions, edge_definitions, n, c_lib, c_road, city_edges, **kwargs):
+    def __init__(self, node_positions, edge_definitions, n, c_lib, c_road, city_edges, batch_edges=False, **kwargs):
         super().__init__(**kwargs)
         self.node_positions = node_positions
         self.edge_definitions = edge_definitions
@@ -113,9 +74,10 @@ class CurvyDashedGraph(Scene):
         self.c_lib = c_lib
         self.c_road = c_road
         self.city_edges = city_edges
+        self.batch_edges = batch_edges
 
     def construct(self) -> None:
-        graph = Graph(self.node_positions, self.edge_definitions)
+        graph = Graph(self.node_positions, self.edge_definitions, batch_edges=self.batch_edges)
         self.add(graph)
 
         # Add legend in the lower-left
@@ -167,9 +129,83 @@ class CurvyDashedGraph(Scene):
         info_text.to_corner(LEFT + UP, buff=0.5)
         self.add(info_text)
 
+def compute_node_positions(n: int) -> Dict[str, np.ndarray]:
+    """
+    Places the cities evenly around a circle.
+    """
+    theta = np.linspace(0, 2 * np.pi, n + 1)[:-1]
+    radius = 3
+    return {
+        str(i): np.array([radius * np.cos(angle), radius * np.sin(angle), 0])
+        for i, angle in zip(range(1, n + 1), theta)
+    }
+
+def render_graph(
+    n: int,
+    c_lib: int,
+    c_road: int,
+    edges: List[Tuple[str, str]],
+    output_path: str,
+    media_dir: str,
+    batch_edges: bool = False
+) -> bool:
+    """
+    Renders a single graph image to `output_path`.
+
+    All Manim configuration is applied through `tempconfig`, so the global
+    `config` is left untouched and several renders can share a process.
+    With `batch_edges`, every road is drawn as one `Roads` mobject.
+
+    Returns:
+        bool: Whether the image was produced.
+    """
+    # Generate node positions and edges
+    node_positions = compute_node_positions(n)
+    edge_definitions = [(u, v) for u, v in edges]
+
+    # Set up Manim configuration
+    scene_config = {
+        "pixel_width": 854,
+        "pixel_height": 480,
+        "frame_rate": 30,
+        "background_color": BLACK,
+        "media_dir": media_dir,
+        "images_dir": media_dir,
+        "video_dir": media_dir,
+        "save_as_gif": False,
+        "save_last_frame": True,
+    }
+
+    with tempconfig(scene_config):
+        # Create an instance of the scene
+        scene = CurvyDashedGraph(
+            node_positions,
+            edge_definitions,
+            n=n,
+            c_lib=c_lib,
+            c_road=c_road,
+            city_edges=edges,
+            batch_edges=batch_edges
+        )
+
+        # Render the scene
+        scene.render()
+
+        # Retrieve the actual output file path
+        actual_output_file = scene.renderer.file_writer.image_file_path
+
+    if not os.path.exists(actual_output_file):
+        return False
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    os.replace(actual_output_file, output_path)
+    return True
+
 def main():
     parser = argparse.ArgumentParser(description="Generate a graph visualization.")
     parser.add_argument("filename", type=str, help="Output filename for the graph image (e.g., graph.png).")
+    parser.add_argument("--batch-edges", action="store_true",
+                        help="Draw every road as a single mobject, which is much faster for large graphs.")
     args = parser.parse_args()
 
     # Ensure the filename ends with .png
@@ -183,44 +219,6 @@ def main():
     print(f"Enter {m} pairs of cities (u_i, v_i):")
     edges = [tuple(input().split()) for _ in range(m)]
 
-    # Generate node positions and edges
-    theta = np.linspace(0, 2 * np.pi, n + 1)[:-1]
-    radius = 3
-    node_positions = {
-        str(i): np.array([radius * np.cos(angle), radius * np.sin(angle), 0])
-        for i, angle in zip(range(1, n + 1), theta)
-    }
-
-    edge_definitions = [(u, v) for u, v in edges]
-
-    # Set up Manim configuration
-    from manim import config
-    config.pixel_width = 854
-    config.pixel_height = 480
-    config.frame_rate = 30
-    config.background_color = BLACK
-    config.media_dir = os.getcwd()
-    config.images_dir = config.media_dir
-    config.video_dir = config.media_dir
-    config.save_as_gif = False
-    config.save_last_frame = True
-
-    # Create an instance of the scene
-    scene = CurvyDashedGraph(
-        node_positions,
-        edge_definitions,
-        n=n,
-        c_lib=c_lib,
-        c_road=c_road,
-        city_edges=edges
-    )
-
-    # Render the scene
-    scene.render()
-
-    # Retrieve the actual output file path
-    actual_output_file = scene.renderer.file_writer.image_file_path
-
     # Define the desired output directory (one level up in 'assets')
     parent_dir = os.path.dirname(os.getcwd())
     assets_dir = os.path.join(parent_dir, "assets")
@@ -229,8 +227,7 @@ def main():
     # Define the desired filename
     desired_filename = os.path.join(assets_dir, args.filename)
 
-    if os.path.exists(actual_output_file):
-        os.rename(actual_output_file, desired_filename)
+    if render_graph(n, c_lib, c_road, edges, desired_filename, media_dir=os.getcwd(), batch_edges=args.batch_edges):
         print(f"Graph saved as {desired_filename}")
     else:
         print("Error: The output file was not created.")
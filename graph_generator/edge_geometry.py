@@ -0,0 +1,125 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Tuple
+import numpy as np
+
+# Manim's DashedVMobject defaults
+DEFAULT_NUM_DASHES = 15
+DEFAULT_DASHED_RATIO = 0.5
+
+def perpendicular_vectors(vectors: np.ndarray) -> np.ndarray:
+    """Returns a perpendicular vector for every row of an (m, 3) array."""
+    perp = np.zeros_like(vectors)
+    perp[:, 0] = -vectors[:, 1]
+    perp[:, 1] = vectors[:, 0]
+    return perp
+
+def edge_endpoints(
+    u_centers: np.ndarray,
+    v_centers: np.ndarray,
+    radius: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes where every edge leaves its two node circles.
+
+    Args:
+        u_centers (np.ndarray): (m, 3) centers of the first node of each edge.
+        v_centers (np.ndarray): (m, 3) centers of the second node of each edge.
+        radius (float): The node radius the edges stop short of.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (m, 3) start points P0 and end points P3.
+    """
+    direction = v_centers - u_centers
+    unit_direction = direction / np.linalg.norm(direction, axis=1, keepdims=True)
+    return u_centers + unit_direction * radius, v_centers - unit_direction * radius
+
+def control_points(
+    P0: np.ndarray,
+    P3: np.ndarray,
+    curvature: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the two control points (P1 and P2) of every edge's cubic Bezier curve
+    to ensure symmetric curvature, for (m, 3) arrays of start and end points.
+    """
+    # Direction from P0 to P3
+    direction = P3 - P0
+    distance = np.linalg.norm(direction, axis=1, keepdims=True)
+
+    # Perpendicular direction for curvature
+    perp_direction = perpendicular_vectors(direction / distance)
+    offset = perp_direction * curvature * distance
+
+    # Calculate P1 and P2 at t=0.25 and t=0.75 along the line
+    P1 = P0 + direction * 0.25 + offset
+    P2 = P0 + direction * 0.75 - offset
+    return P1, P2
+
+def edge_curves(
+    u_centers: np.ndarray,
+    v_centers: np.ndarray,
+    radius: float,
+    curvature: float
+) -> np.ndarray:
+    """
+    Computes the cubic Bezier curve of every edge in one pass.
+
+    Returns:
+        np.ndarray: An (m, 4, 3) array holding P0, P1, P2 and P3 of each edge.
+    """
+    P0, P3 = edge_endpoints(u_centers, v_centers, radius)
+    P1, P2 = control_points(P0, P3, curvature)
+    return np.stack([P0, P1, P2, P3], axis=1)
+
+def _blossom(curves: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Evaluates the polar form of cubic curves (m, 1, 4, 3) at parameters of shape
+    (k,) with de Casteljau, using a different parameter on each level.
+    """
+    points = curves
+    for t in (a, b, c):
+        t = t[None, :, None, None]
+        points = points[:, :, :-1] + (points[:, :, 1:] - points[:, :, :-1]) * t
+    return points[:, :, 0]
+
+def sample_curves(curves: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Evaluates every curve at `num_points` evenly spaced parameters, from its start
+    to its end, so it can be drawn as a polyline.
+
+    Returns:
+        np.ndarray: (m, num_points, 3) points along the curves.
+    """
+    t = np.linspace(0, 1, num_points)
+    return _blossom(curves[:, None], t, t, t)
+
+def dash_curves(
+    curves: np.ndarray,
+    num_dashes: int = DEFAULT_NUM_DASHES,
+    dashed_ratio: float = DEFAULT_DASHED_RATIO
+) -> np.ndarray:
+    """
+    Cuts every curve into dashes at once, the bulk equivalent of wrapping each
+    curve in a DashedVMobject. Dashes are spaced evenly in the curve parameter.
+
+    Args:
+        curves (np.ndarray): (m, 4, 3) cubic Bezier control points.
+        num_dashes (int): Number of dashes per curve.
+        dashed_ratio (float): Fraction of each dash period that is drawn.
+
+    Returns:
+        np.ndarray: (m * num_dashes, 4, 3) control points of the dashes.
+    """
+    t0 = np.arange(num_dashes) / num_dashes
+    t1 = t0 + dashed_ratio / num_dashes
+    curves = curves[:, None]
+
+    dashes = np.stack([
+        _blossom(curves, t0, t0, t0),
+        _blossom(curves, t0, t0, t1),
+        _blossom(curves, t0, t1, t1),
+        _blossom(curves, t1, t1, t1),
+    ], axis=2)
+    return dashes.reshape(-1, 4, 3)
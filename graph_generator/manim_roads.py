@@ -0,0 +1,47 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Any, Optional
+from manim import CubicBezier, DashedVMobject, Mobject, VMobject
+from edge_geometry import DEFAULT_NUM_DASHES, dash_curves, edge_curves
+import numpy as np
+
+class Edge(VMobject):
+    def __init__(
+        self,
+        u: Mobject,
+        v: Mobject,
+        curvature: float = 0.2,
+        radius: float = 0.3,
+        points: Optional[np.ndarray] = None,
+        **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self.u = u
+        self.v = v
+        self.curvature = curvature
+        self.radius = radius
+        self.create_edge(points)
+
+    def create_edge(self, points: Optional[np.ndarray] = None) -> None:
+        """
+        Draws the edge as a dashed cubic Bezier curve. `points` holds the curve's
+        precomputed (4, 3) control points, as produced in bulk by `edge_curves`.
+        """
+        if points is None:
+            points = edge_curves(
+                self.u.get_center()[np.newaxis],
+                self.v.get_center()[np.newaxis],
+                self.radius,
+                self.curvature
+            )[0]
+        bezier_curve = CubicBezier(*points)
+
+        self.dashed_curve = DashedVMobject(bezier_curve)
+        self.add(self.dashed_curve)
+
+class Roads(VMobject):
+    """All edges drawn as a single dashed VMobject, with the dashes cut in bulk."""
+    def __init__(self, curves: np.ndarray, num_dashes: int = DEFAULT_NUM_DASHES, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.set_points(dash_curves(curves, num_dashes).reshape(-1, 3))
@@ -4,10 +4,18 @@
 import argparse
 from typing import Any, Dict, List, Tuple
 from manim import *
+from edge_geometry import edge_curves
+from manim_roads import Edge, Roads
+from barnes_hut_layout import barnes_hut_layout
+from batch_render import road_graph
 import numpy as np
 import os
 import networkx as nx
 
+# `spring` is networkx's exact O(n^2) layout; `barnes-hut` approximates the same
+# forces in O(n log n) per iteration, for graphs with many thousands of cities
+LAYOUT_ENGINES = ("spring", "barnes-hut")
+
 class Node(VGroup):
     def __init__(
         self,
@@ -29,71 +37,6 @@ class Node(VGroup):
     def get_center(self) -> np.ndarray:
         return self.circle.get_center()
 
-class Edge(VMobject):
-    def __init__(
-        self,
-        u: Node,
-        v: Node,
-        curvature: float = 0.2,
-        radius: float = 0.3,
-        **kwargs: Any
-    ) -> None:
-        super().__init__(**kwargs)
-        self.u = u
-        self.v = v
-        self.curvature = curvature
-        self.radius = radius
-        self.create_edge()
-        
-    def create_edge(self) -> None:
-        unit_direction: np.ndarray = self.get_unit_direction()
-        
-        P0: np.ndarray = self.u.get_center() + unit_direction * self.radius
-        P3: np.ndarray = self.v.get_center() - unit_direction * self.radius
-        
-        distance: float = np.linalg.norm(P3 - P0)
-        P1, P2 = self.compute_control_points(P0, P3, self.curvature, distance)
-        bezier_curve = CubicBezier(P0, P1, P2, P3)
-        
-        self.dashed_curve = DashedVMobject(bezier_curve)
-        self.add(self.dashed_curve)  
-    
-    def get_unit_direction(self) -> np.ndarray:
-        direction = self.v.get_center() - self.u.get_center()
-        return direction / np.linalg.norm(direction)
-    
-    @staticmethod
-    def get_perpendicular_vector(vector: np.ndarray) -> np.ndarray:
-        """Returns a perpendicular vector to the input vector."""
-        return np.array([-vector[1], vector[0], 0])
-    
-    def compute_control_points(
-        self,
-        P0: np.ndarray,
-        P3: np.ndarray,
-        curvature: float,
-        distance: float
-    ) -> Tuple[np.ndarray, np.ndarray]:
-        """
-        Compute the two control points (P1 and P2) for a cubic Bezier curve
-        to ensure symmetric curvature.
-        """
-        # Direction from P0 to P3
-        direction: np.ndarray = P3 - P0
-        unit_direction: np.ndarray = direction / np.linalg.norm(direction)
-        
-        # Perpendicular direction for curvature
-        perp_direction: np.ndarray = self.get_perpendicular_vector(unit_direction)
-        
-        # Calculate P1 and P2 at t=0.25 and t=0.75 along the line
-        t1: float = 0.25
-        t2: float = 0.75
-        
-        P1: np.ndarray = P0 + (direction * t1) + (perp_direction * curvature * distance)
-        P2: np.ndarray = P0 + (direction * t2) - (perp_direction * curvature * distance)
-        
-        return P1, P2
-     
 class Graph(VGroup):
     def __init__(
         self,
@@ -101,13 +44,16 @@ class Graph(VGroup):
         edges_data: List[Tuple[str, str]],
         node_radius: float,
         font_size: float,
+        batch_edges: bool = False,
         **kwargs
     ) -> None:
         super().__init__(**kwargs)
         self.nodes = {}
         self.edges = []
+        self.roads = None
         self.node_radius = node_radius
         self.font_size = font_size
+        self.batch_edges = batch_edges
         self.create_nodes(nodes_data)
         self.create_edges(edges_data)
         
@@ -118,10 +64,23 @@ class Graph(VGroup):
             self.add(node)
     
     def create_edges(self, edges_data: List[Tuple[str, str]]) -> None:
-        for u_label, v_label in edges_data:
+        if not edges_data:
+            return
+
+        # Compute every edge's curve in a single vectorized pass
+        u_centers = np.array([self.nodes[u_label].get_center() for u_label, _ in edges_data])
+        v_centers = np.array([self.nodes[v_label].get_center() for _, v_label in edges_data])
+        curves = edge_curves(u_centers, v_centers, radius=self.node_radius, curvature=0.2)
+
+        if self.batch_edges:
+            self.roads = Roads(curves)
+            self.add(self.roads)
+            return
+
+        for (u_label, v_label), points in zip(edges_data, curves):
             u: Node = self.nodes[u_label]
             v: Node = self.nodes[v_label]
-            edge = Edge(u, v, curvature=0.2, radius=self.node_radius)
+            edge = Edge(u, v, curvature=0.2, radius=self.node_radius, points=points)
             self.edges.append(edge)
             self.add(edge)
 
@@ -137,6 +96,7 @@ class CurvyDashedGraph(Scene):
         city_edges: List[Tuple[str, str]],
         node_radius: float,
         font_size: float,
+        batch_edges: bool = False,
         **kwargs
     ):
         super().__init__(**kwargs)
@@ -148,6 +108,7 @@ class CurvyDashedGraph(Scene):
         self.city_edges = city_edges
         self.node_radius = node_radius
         self.font_size = font_size
+        self.batch_edges = batch_edges
 
     def construct(self) -> None:
         # Create the graph with fixed sizes
@@ -155,7 +116,8 @@ class CurvyDashedGraph(Scene):
             self.node_positions,
             self.edge_definitions,
             node_radius=self.node_radius,
-            font_size=self.font_size
+            font_size=self.font_size,
+            batch_edges=self.batch_edges
         )
         self.add(graph)
 
@@ -209,80 +171,137 @@ class CurvyDashedGraph(Scene):
             info_text.to_corner(LEFT + UP, buff=0.5)
             self.add(info_text)
 
-def main():
-    parser = argparse.ArgumentParser(description="Generate a graph visualization.")
-    parser.add_argument("filename", type=str, help="Output filename for the graph image (e.g., graph.png).")
-    args = parser.parse_args()
-
-    # Ensure the filename ends with .png
-    if not args.filename.endswith(".png"):
-        raise ValueError("Output filename must have a .png extension.")
-
-    # Define fixed node size and font size
-    node_radius: float = 0.15
-    font_size: float = 12
-
-    # Prompt for input
-    print("Enter number of cities (n), number of roads (m), library cost (c_lib), and road cost (c_road):")
-    n, m, c_lib, c_road = map(int, input().split())
-
-    print(f"Enter {m} pairs of cities (u_i, v_i):")
-    edges = [tuple(input().split()) for _ in range(m)]
-
+def compute_node_positions(
+    n: int,
+    edges: List[Tuple[str, str]],
+    node_radius: float,
+    layout_engine: str = "spring"
+) -> Dict[str, np.ndarray]:
+    """
+    Lays out the cities with a force-directed algorithm and clips them to the frame.
+    """
     # Build the graph using NetworkX to compute positions
-    G = nx.Graph()
-    G.add_nodes_from(str(i) for i in range(1, n + 1))
-    G.add_edges_from(edges)
+    G = road_graph(n, edges)
 
     # Compute positions using a force-directed algorithm
     # Adjust the scale to fit within the frame, leaving a margin
-    pos = nx.spring_layout(G, scale=4, seed=42, k=0.15, iterations=100)
+    if layout_engine == "barnes-hut":
+        pos = barnes_hut_layout(list(G.nodes), list(G.edges), scale=4, seed=42, k=0.15, iterations=100)
+    elif layout_engine == "spring":
+        pos = nx.spring_layout(G, scale=4, seed=42, k=0.15, iterations=100)
+    else:
+        raise ValueError(f"Unknown layout engine '{layout_engine}'.")
 
     # Convert positions to numpy arrays suitable for Manim
     # Ensure nodes are within the frame by clipping their positions
-    from manim import config
-
     frame_width = config.frame_width  # Default is 14
     frame_height = config.frame_height  # Default is 8
 
     max_x = frame_width / 2 - node_radius
     max_y = frame_height / 2 - node_radius
 
-    node_positions = {
+    return {
         node: np.clip(np.array([pos[node][0], pos[node][1], 0]),
                       a_min=[-max_x, -max_y, 0],
                       a_max=[max_x, max_y, 0])
         for node in G.nodes
     }
-    edge_definitions = [(u, v) for u, v in G.edges]
+
+def render_graph(
+    n: int,
+    c_lib: int,
+    c_road: int,
+    edges: List[Tuple[str, str]],
+    output_path: str,
+    media_dir: str,
+    layout_engine: str = "spring",
+    batch_edges: bool = False
+) -> bool:
+    """
+    Renders a single graph image to `output_path`.
+
+    All Manim configuration is applied through `tempconfig`, so the global
+    `config` is left untouched and several renders can share a process.
+
+    Args:
+        n (int): The number of cities.
+        c_lib (int): The cost to build a single library.
+        c_road (int): The cost to build a single road.
+        edges (List[Tuple[str, str]]): The possible roads, as pairs of city labels.
+        output_path (str): Where the finished PNG is moved to.
+        media_dir (str): Scratch directory Manim writes its intermediate files to.
+        layout_engine (str): One of `LAYOUT_ENGINES`.
+        batch_edges (bool): Draw every road as one `Roads` mobject, for large graphs.
+
+    Returns:
+        bool: Whether the image was produced.
+    """
+    # Define fixed node size and font size
+    node_radius: float = 0.15
+    font_size: float = 12
+
+    node_positions = compute_node_positions(n, edges, node_radius, layout_engine)
+    # Each road is drawn once, however often it is listed
+    edge_definitions = [(u, v) for u, v in road_graph(n, edges).edges]
 
     # Set up Manim configuration
-    config.pixel_width = 1920
-    config.pixel_height = 1080
-    config.frame_rate = 30
-    config.background_color = BLACK
-    config.media_dir = os.getcwd()
-    config.images_dir = config.media_dir
-    config.video_dir = config.media_dir
-    config.save_as_gif = False
-    config.save_last_frame = True
-
-    # Create an instance of the scene with fixed node sizes
-    scene = CurvyDashedGraph(
-        node_positions=node_positions,
-        edge_definitions=edge_definitions,
-        n=n,
-        c_lib=c_lib,
-        c_road=c_road,
-        city_edges=edges,
-        node_radius=node_radius,
-        font_size=font_size
-    )
-
-    scene.render()
-
-    # Retrieve the actual output file path
-    actual_output_file = scene.renderer.file_writer.image_file_path
+    scene_config = {
+        "pixel_width": 1920,
+        "pixel_height": 1080,
+        "frame_rate": 30,
+        "background_color": BLACK,
+        "media_dir": media_dir,
+        "images_dir": media_dir,
+        "video_dir": media_dir,
+        "save_as_gif": False,
+        "save_last_frame": True,
+    }
+
+    with tempconfig(scene_config):
+        # Create an instance of the scene with fixed node sizes
+        scene = CurvyDashedGraph(
+            node_positions=node_positions,
+            edge_definitions=edge_definitions,
+            n=n,
+            c_lib=c_lib,
+            c_road=c_road,
+            city_edges=edges,
+            node_radius=node_radius,
+            font_size=font_size,
+            batch_edges=batch_edges
+        )
+
+        scene.render()
+
+        # Retrieve the actual output file path
+        actual_output_file = scene.renderer.file_writer.image_file_path
+
+    if not os.path.exists(actual_output_file):
+        return False
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    os.replace(actual_output_file, output_path)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a graph visualization.")
+    parser.add_argument("filename", type=str, help="Output filename for the graph image (e.g., graph.png).")
+    parser.add_argument("--layout-engine", type=str, choices=LAYOUT_ENGINES, default="spring",
+                        help="Force-directed layout; barnes-hut scales to large graphs.")
+    parser.add_argument("--batch-edges", action="store_true",
+                        help="Draw every road as a single mobject, which is much faster for large graphs.")
+    args = parser.parse_args()
+
+    # Ensure the filename ends with .png
+    if not args.filename.endswith(".png"):
+        raise ValueError("Output filename must have a .png extension.")
+
+    # Prompt for input
+    print("Enter number of cities (n), number of roads (m), library cost (c_lib), and road cost (c_road):")
+    n, m, c_lib, c_road = map(int, input().split())
+
+    print(f"Enter {m} pairs of cities (u_i, v_i):")
+    edges = [tuple(input().split()) for _ in range(m)]
 
     # Define the desired output directory
     output_dir = os.path.join(os.getcwd(), "assets")
@@ -291,13 +310,11 @@ def main():
     # Define the desired filename
     desired_filename = os.path.join(output_dir, args.filename)
 
-    if os.path.exists(actual_output_file):
-        os.rename(actual_output_file, desired_filename)
+    if render_graph(n, c_lib, c_road, edges, desired_filename, media_dir=os.getcwd(),
+                    layout_engine=args.layout_engine, batch_edges=args.batch_edges):
         print(f"Graph saved as {desired_filename}")
     else:
         print("Error: The output file was not created.")
 
-        print("Error: The output file was not created.")
-
 if __name__ == "__main__":
     main()
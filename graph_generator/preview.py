@@ -0,0 +1,291 @@
+# Copyright 2024 Nicholas Fleischhauer
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import argparse
+import importlib
+import os
+from typing import Dict, List, Tuple
+import numpy as np
+
+from batch_render import LAYOUT_MODULES, read_graph_file, road_graph
+from barnes_hut_layout import barnes_hut_layout
+from edge_geometry import DEFAULT_DASHED_RATIO, DEFAULT_NUM_DASHES, dash_curves, edge_curves, sample_curves
+
+# Manim's default frame, in scene units
+FRAME_HEIGHT = 8.0
+FRAME_WIDTH = FRAME_HEIGHT * 16 / 9
+
+# Same look as the Manim scenes
+BACKGROUND_COLOR = "#000000"
+NODE_COLOR = "#83C167"
+EDGE_COLOR = "#FFFFFF"
+
+# Node radius each full-quality script uses for its layout
+NODE_RADIUS: Dict[str, float] = {
+    "networkx": 0.15,
+    "circular": 0.3,
+}
+EDGE_CURVATURE: Dict[str, float] = {
+    "networkx": 0.2,
+    "circular": 0.3,
+}
+
+# Above this many nodes labels would be unreadable, so they are skipped
+MAX_LABELED_NODES = 200
+
+# Above this many roads the PNG draws them as solid, aliased polylines of
+# `SOLID_ROAD_SEGMENTS` segments each, since rasterizing every dash dominates
+# the render; SVG output keeps the dashes at any size
+MAX_DASHED_PNG_ROADS = 2000
+SOLID_ROAD_SEGMENTS = 4
+
+# Above this many nodes the PNG fills them opaque, in the color the translucent
+# fill has over the background, since blending every overlapping disk dominates
+MAX_TRANSLUCENT_PNG_NODES = 2000
+NODE_OPACITY = 0.8
+
+def circular_positions(n: int) -> Dict[str, np.ndarray]:
+    """Places the cities evenly around a circle, like `dynamic_graph_visualization.py`."""
+    theta = np.linspace(0, 2 * np.pi, n + 1)[:-1]
+    radius = 3
+    coords = np.stack([radius * np.cos(theta), radius * np.sin(theta), np.zeros(n)], axis=1)
+    return {str(i): coords[i - 1] for i in range(1, n + 1)}
+
+def networkx_positions(
+    n: int,
+    edges: List[Tuple[str, str]],
+    node_radius: float,
+    layout_engine: str = "spring"
+) -> Dict[str, np.ndarray]:
+    """Lays out the cities like `networkx_visualization.py`, without going through Manim."""
+    nodes = [str(i) for i in range(1, n + 1)]
+    if layout_engine == "barnes-hut":
+        pos = barnes_hut_layout(nodes, edges, scale=4, seed=42, k=0.15, iterations=100)
+    else:
+        import networkx as nx
+
+        G = nx.Graph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from(edges)
+        pos = nx.spring_layout(G, scale=4, seed=42, k=0.15, iterations=100)
+
+    max_x = FRAME_WIDTH / 2 - node_radius
+    max_y = FRAME_HEIGHT / 2 - node_radius
+    return {
+        node: np.clip(np.array([pos[node][0], pos[node][1], 0]),
+                      a_min=[-max_x, -max_y, 0],
+                      a_max=[max_x, max_y, 0])
+        for node in nodes
+    }
+
+def compute_positions(
+    layout: str,
+    n: int,
+    edges: List[Tuple[str, str]],
+    layout_engine: str = "spring"
+) -> Dict[str, np.ndarray]:
+    if layout == "circular":
+        return circular_positions(n)
+    return networkx_positions(n, edges, NODE_RADIUS[layout], layout_engine)
+
+def graph_arrays(
+    node_positions: Dict[str, np.ndarray],
+    edges: List[Tuple[str, str]],
+    node_radius: float,
+    curvature: float
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Flattens the same `nodes_data`/`edges_data` a Manim `Graph` takes into arrays.
+
+    Returns:
+        Tuple[List[str], np.ndarray, np.ndarray]: The node labels, their (n, 3)
+        centers and the (m, 4, 3) Bezier curves of the edges.
+    """
+    labels = list(node_positions)
+    index = {label: i for i, label in enumerate(labels)}
+    centers = np.array([node_positions[label] for label in labels], dtype=float).reshape(-1, 3)
+
+    if not edges:
+        return labels, centers, np.empty((0, 4, 3))
+
+    u = np.fromiter((index[u_label] for u_label, _ in edges), dtype=np.intp, count=len(edges))
+    v = np.fromiter((index[v_label] for _, v_label in edges), dtype=np.intp, count=len(edges))
+    return labels, centers, edge_curves(centers[u], centers[v], node_radius, curvature)
+
+def write_svg(
+    path: str,
+    labels: List[str],
+    centers: np.ndarray,
+    curves: np.ndarray,
+    node_radius: float,
+    pixel_width: int = 1920
+) -> None:
+    """Writes the graph straight to an SVG file, without any plotting library."""
+    scale = pixel_width / FRAME_WIDTH
+    pixel_height = round(FRAME_HEIGHT * scale)
+
+    # Scene units are centered with y pointing up, SVG is top-left with y pointing down
+    def to_pixels(points: np.ndarray) -> np.ndarray:
+        return np.stack([points[..., 0] * scale + pixel_width / 2,
+                         pixel_height / 2 - points[..., 1] * scale], axis=-1)
+
+    curve_pixels = to_pixels(curves).reshape(-1, 8)
+    center_pixels = to_pixels(centers)
+    radius = node_radius * scale
+
+    # An even dash pattern approximating DashedVMobject's
+    dash = float(np.mean(np.linalg.norm(curve_pixels[:, 6:] - curve_pixels[:, :2], axis=1))) if len(curves) else 0.0
+    period = dash / DEFAULT_NUM_DASHES
+    dash_on = period * DEFAULT_DASHED_RATIO
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixel_width}" height="{pixel_height}" '
+        f'viewBox="0 0 {pixel_width} {pixel_height}">',
+        f'<rect width="100%" height="100%" fill="{BACKGROUND_COLOR}"/>',
+        f'<g fill="none" stroke="{EDGE_COLOR}" stroke-width="2" '
+        f'stroke-dasharray="{dash_on:.2f} {period - dash_on:.2f}">',
+    ]
+    parts.extend(
+        '<path d="M%.1f %.1fC%.1f %.1f %.1f %.1f %.1f %.1f"/>' % tuple(row)
+        for row in curve_pixels.tolist()
+    )
+    parts.append(f'</g><g fill="{NODE_COLOR}" fill-opacity="{NODE_OPACITY}">')
+    parts.extend(
+        '<circle cx="%.1f" cy="%.1f" r="%.1f"/>' % (x, y, radius)
+        for x, y in center_pixels.tolist()
+    )
+    parts.append('</g>')
+
+    if len(labels) <= MAX_LABELED_NODES:
+        parts.append(f'<g fill="#FFFFFF" font-size="{radius:.1f}" text-anchor="middle" dominant-baseline="central">')
+        parts.extend(
+            f'<text x="{x:.1f}" y="{y:.1f}">{label}</text>'
+            for label, (x, y) in zip(labels, center_pixels.tolist())
+        )
+        parts.append('</g>')
+
+    parts.append('</svg>')
+    with open(path, 'w') as file:
+        file.write("\n".join(parts))
+
+def write_png(
+    path: str,
+    labels: List[str],
+    centers: np.ndarray,
+    curves: np.ndarray,
+    node_radius: float,
+    pixel_width: int = 1920
+) -> None:
+    """
+    Writes the graph to a PNG with matplotlib's Agg canvas, without pyplot. Graphs
+    with more than `MAX_DASHED_PNG_ROADS` roads get solid roads, see `write_svg` for
+    a dashed image of those.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.colors import to_rgb
+    from matplotlib.figure import Figure
+    from matplotlib.patches import PathPatch
+    from matplotlib.path import Path
+
+    dpi = 100
+    figure = Figure(figsize=(pixel_width / dpi, pixel_width / dpi * FRAME_HEIGHT / FRAME_WIDTH), dpi=dpi)
+    FigureCanvasAgg(figure)
+    axes = figure.add_axes((0, 0, 1, 1))
+    axes.set_xlim(-FRAME_WIDTH / 2, FRAME_WIDTH / 2)
+    axes.set_ylim(-FRAME_HEIGHT / 2, FRAME_HEIGHT / 2)
+    axes.set_aspect("equal")
+    axes.set_axis_off()
+    figure.set_facecolor(BACKGROUND_COLOR)
+
+    if len(curves) <= MAX_DASHED_PNG_ROADS:
+        # Cut the dashes in bulk and draw them as straight strokes of one compound
+        # path, which Agg rasterizes far faster than dashed Bezier curves
+        dashes = dash_curves(curves)[:, ::3, :2]
+        codes = np.tile([Path.MOVETO, Path.LINETO], len(dashes))
+        roads = Path(dashes.reshape(-1, 2), codes)
+        axes.add_artist(PathPatch(roads, facecolor="none", edgecolor=EDGE_COLOR, linewidth=1))
+    else:
+        polylines = sample_curves(curves, SOLID_ROAD_SEGMENTS + 1)[..., :2]
+        axes.add_collection(LineCollection(polylines, colors=EDGE_COLOR, linewidths=1, antialiaseds=False))
+
+    if len(centers) <= MAX_TRANSLUCENT_PNG_NODES:
+        node_color, node_alpha = to_rgb(NODE_COLOR), NODE_OPACITY
+    else:
+        blended = NODE_OPACITY * np.array(to_rgb(NODE_COLOR)) + (1 - NODE_OPACITY) * np.array(to_rgb(BACKGROUND_COLOR))
+        node_color, node_alpha = tuple(blended), None
+
+    # Markers are rasterized once and stamped at every center, unlike one path per node
+    marker_size = 2 * node_radius * pixel_width / FRAME_WIDTH * 72 / dpi
+    axes.plot(
+        centers[:, 0], centers[:, 1], linestyle="none", marker="o", markersize=marker_size,
+        markeredgewidth=0, color=node_color, alpha=node_alpha
+    )
+
+    if len(labels) <= MAX_LABELED_NODES:
+        for label, (x, y) in zip(labels, centers[:, :2]):
+            axes.text(x, y, label, color="white", fontsize=8, ha="center", va="center")
+
+    # Light compression: a preview is rewritten often and rarely kept
+    figure.savefig(path, facecolor=BACKGROUND_COLOR, pil_kwargs={"compress_level": 1})
+
+def render_preview(
+    n: int,
+    edges: List[Tuple[str, str]],
+    output_path: str,
+    layout: str = "circular",
+    layout_engine: str = "spring"
+) -> None:
+    """
+    Renders a quick preview of a graph. The format follows the extension of
+    `output_path`: `.svg` is written directly, `.png` goes through matplotlib.
+    """
+    node_radius = NODE_RADIUS[layout]
+    # Each road is drawn once, however often it is listed, like the full render
+    edges = [(u, v) for u, v in road_graph(n, edges).edges]
+    node_positions = compute_positions(layout, n, edges, layout_engine)
+    labels, centers, curves = graph_arrays(node_positions, edges, node_radius, EDGE_CURVATURE[layout])
+
+    if output_path.endswith(".svg"):
+        write_svg(output_path, labels, centers, curves, node_radius)
+    elif output_path.endswith(".png"):
+        write_png(output_path, labels, centers, curves, node_radius)
+    else:
+        raise ValueError("Output filename must have a .svg or .png extension.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Preview a graph visualization without starting Manim.")
+    parser.add_argument("graph", type=str, help="Graph file: a line `n m c_lib c_road` followed by m lines `u v`.")
+    parser.add_argument("filename", type=str,
+                        help=f"Output filename (.svg or .png). Above {MAX_DASHED_PNG_ROADS} roads a PNG draws them "
+                             "solid to stay fast; use .svg to keep the dashes on large graphs.")
+    parser.add_argument("--layout", type=str, choices=sorted(LAYOUT_MODULES), default="circular",
+                        help="Layout of the full-quality script to mimic.")
+    parser.add_argument("--layout-engine", type=str, choices=["spring", "barnes-hut"], default="spring",
+                        help="Force-directed engine of the networkx layout; barnes-hut scales to large graphs.")
+    parser.add_argument("--full", action="store_true",
+                        help="Render the full-quality PNG with Manim instead of a preview.")
+    parser.add_argument("--batch-edges", action="store_true",
+                        help="With --full, draw every road as a single mobject, for large graphs.")
+    args = parser.parse_args()
+
+    n, c_lib, c_road, edges = read_graph_file(args.graph)
+
+    if args.full:
+        # Only the full-quality render pays for importing Manim
+        if not args.filename.endswith(".png"):
+            raise ValueError("Output filename must have a .png extension.")
+        module = importlib.import_module(LAYOUT_MODULES[args.layout])
+        # Only the networkx layout is force-directed
+        engine = {"layout_engine": args.layout_engine} if args.layout == "networkx" else {}
+        created = module.render_graph(
+            n, c_lib, c_road, edges, args.filename, media_dir=os.getcwd(), batch_edges=args.batch_edges, **engine
+        )
+        print(f"Graph saved as {args.filename}" if created else "Error: The output file was not created.")
+        return
+
+    render_preview(n, edges, args.filename, layout=args.layout, layout_engine=args.layout_engine)
+    print(f"Preview saved as {args.filename}")
+
+if __name__ == "__main__":
+    main()
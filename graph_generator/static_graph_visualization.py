@@ -3,6 +3,8 @@
 
 from typing import Any, Dict, List, Tuple
 from manim import *
+from edge_geometry import edge_curves
+from manim_roads import Edge, Roads
 import numpy as np
 import argparse
 
@@ -20,72 +22,18 @@ class Node(VGroup):
     def get_center(self) -> np.ndarray:
         return self.circle.get_center()
 
-class Edge(VMobject):
-    def __init__(self, u: Node, v: Node, curvature: float = 0.2, radius: float = 0.3, **kwargs: Any) -> None:
-        super().__init__(**kwargs)
-        self.u = u
-        self.v = v
-        self.curvature = curvature
-        self.radius = radius
-        self.create_edge()
-        
-    def create_edge(self) -> None:
-        unit_direction: np.ndarray = self.get_unit_direction()
-        
-        P0: np.ndarray = self.u.get_center() + unit_direction * self.radius
-        P3: np.ndarray = self.v.get_center() - unit_direction * self.radius
-        
-        distance: float = np.linalg.norm(P3 - P0)
-        P1, P2 = self.compute_control_points(P0, P3, self.curvature, distance)
-        bezier_curve = CubicBezier(P0, P1, P2, P3)
-        
-        self.dashed_curve = DashedVMobject(bezier_curve)
-        self.add(self.dashed_curve)  
-    
-    def get_unit_direction(self) -> np.ndarray:
-        direction = self.v.get_center() - self.u.get_center()
-        return direction / np.linalg.norm(direction)
-    
-    @staticmethod
-    def get_perpendicular_vector(vector) -> np.ndarray:
-        """Returns a perpendicular vector to the input vector."""
-        return np.array([-vector[1], vector[0], 0])
-    
-    def compute_control_points(
-        self,
-        P0: np.ndarray,
-        P3: np.ndarray,
-        curvature: float,
-        distance: float) -> Tuple[np.ndarray, np.ndarray]:
-        """
-        Compute the two control points (P1 and P2) for a cubic Bezier curve
-        to ensure symmetric curvature.
-        """
-        # Direction from P0 to P3
-        direction: np.ndarray = P3 - P0
-        unit_direction: np.ndarray = direction / np.linalg.norm(direction)
-        
-        # Perpendicular direction for curvature
-        perp_direction: np.ndarray = self.get_perpendicular_vector(unit_direction)
-        
-        # Calculate P1 and P2 at t=0.25 and t=0.75 along the line
-        t1: float = 0.25
-        t2: float = 0.75
-        
-        P1: np.ndarray = P0 + (direction * t1) + (perp_direction * curvature * distance)
-        P2: np.ndarray = P0 + (direction * t2) - (perp_direction * curvature * distance)
-        
-        return P1, P2
-     
 class Graph(VGroup):
     def __init__(
         self,
         nodes_data: Dict[str, np.ndarray],
         edges_data: List[Tuple[str, str]],
+        batch_edges: bool = False,
         **kwargs) -> None:
         super().__init__(**kwargs)
         self.nodes = {}
         self.edges = []
+        self.roads = None
+        self.batch_edges = batch_edges
         self.create_nodes(nodes_data)
         self.create_edges(edges_data)
         
@@ -96,14 +44,31 @@ class Graph(VGroup):
             self.add(node)
     
     def create_edges(self, edges_data: List[Tuple[str, str]]) -> None:
-        for u_label, v_label in edges_data:
+        if not edges_data:
+            return
+
+        # Compute every edge's curve in a single vectorized pass
+        u_centers = np.array([self.nodes[u_label].get_center() for u_label, _ in edges_data])
+        v_centers = np.array([self.nodes[v_label].get_center() for _, v_label in edges_data])
+        curves = edge_curves(u_centers, v_centers, radius=0.3, curvature=0.3)
+
+        if self.batch_edges:
+            self.roads = Roads(curves)
+            self.add(self.roads)
+            return
+
+        for (u_label, v_label), points in zip(edges_data, curves):
             u: Node = self.nodes[u_label]
             v: Node = self.nodes[v_label]
-            edge = Edge(u, v, curvature=0.3)
+            edge = Edge(u, v, curvature=0.3, points=points)
             self.edges.append(edge)
             self.add(edge)
         
 class CurvyDashedGraph(Scene):
+    def __init__(self, batch_edges: bool = False, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.batch_edges = batch_edges
+
     def construct(self) -> None:
         node_positions = {
             "1": UP,
@@ -124,8 +89,10 @@ class CurvyDashedGraph(Scene):
             ("6", "7")
         ]
         
-        graph = Graph(node_positions, edge_definitions)
+        graph = Graph(node_positions, edge_definitions, batch_edges=self.batch_edges)
         self.add(graph)
+        self.graph = graph
+        self.edge_definitions = edge_definitions
         
         # Add legend in the lower-left
         legend_node = Node('n', ORIGIN, radius=0.3)
@@ -173,3 +140,35 @@ class CurvyDashedGraph(Scene):
         # Move to the top-left corner
         info_text.to_corner(LEFT + UP, buff=0.5)
         self.add(info_text)
+
+
+def connected_components(labels: List[str], edges: List[Tuple[str, str]]) -> List[List[str]]:
+    """Groups the node labels into connected components, each in order of discovery."""
+    neighbors: Dict[str, List[str]] = {label: [] for label in labels}
+    for u, v in edges:
+        neighbors[u].append(v)
+        neighbors[v].append(u)
+
+    seen = set()
+    components = []
+    for label in labels:
+        if label in seen:
+            continue
+        seen.add(label)
+        component = [label]
+        # `component` doubles as the BFS queue
+        for current in component:
+            for neighbor in neighbors[current]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    component.append(neighbor)
+        components.append(component)
+    return components
+
+class ConnectedComponentGraph(CurvyDashedGraph):
+    """HackerLand with every connected component outlined in red."""
+    def construct(self) -> None:
+        super().construct()
+        for component in connected_components(list(self.graph.nodes), self.edge_definitions):
+            members = VGroup(*(self.graph.nodes[label] for label in component))
+            self.add(SurroundingRectangle(members, color=RED, buff=0.3, corner_radius=0.4))